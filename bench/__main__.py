@@ -0,0 +1,66 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+import argparse
+import json
+import platform
+import sys
+import time
+
+from bench.scenarios import SCALES, scenarios
+
+
+def compare(results, path, threshold):
+    # return the names slower than the old run
+    # by more than the threshold, e.g. 1.25
+    with open(path) as f:
+        old = {r['name']: r for r in json.load(f)['results']}
+    slower = []
+    for r in results:
+        last = old.get(r['name'])
+        if last is None: continue
+        ratio = r['seconds'] / last['seconds']
+        print('%-40s %8.3fx' % (r['name'], ratio))
+        if ratio > threshold: slower.append(r['name'])
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m bench')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', default='',
+                        help='the groups to run, e.g. slr_table,lr_parse')
+    parser.add_argument('--label', default='',
+                        help='e.g. the version or the commit')
+    parser.add_argument('--output', help='write the results as JSON')
+    parser.add_argument('--compare', help='the JSON of an old run')
+    parser.add_argument('--threshold', type=float, default=1.25)
+    args = parser.parse_args(argv)
+    # the LL parser recurses once per operand
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100000))
+    groups = set(filter(None, args.only.split(',')))
+    results = []
+    for group, thunk in scenarios(args.scale, args.repeat):
+        if groups and group not in groups: continue
+        r = thunk()
+        results.append(r)
+        print('%-40s %10.6fs %8d KB' % (r['name'], r['seconds'],
+                                         r['peak_kb']))
+    if args.output:
+        report = {'label': args.label,
+                  'scale': args.scale,
+                  'python': platform.python_version(),
+                  'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                  'results': results}
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        slower = compare(results, args.compare, args.threshold)
+        if slower:
+            print('Slower than %s: %s' % (args.compare, ', '.join(slower)))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+from pslrp import Grammar
+
+
+def meet_first(sym, args, stack):
+    # production: X -> Y ...
+    sym.value = args[0].value
+
+
+def meet_second(sym, args, stack):
+    # production: X -> ( Y )
+    sym.value = args[1].value
+
+
+def meet_sum(sym, args, stack):
+    # production: X -> X op Y
+    sym.value = args[0].value + args[2].value
+
+
+def meet_count(sym, args, stack):
+    # production: P -> P S
+    sym.value = args[0].value + 1
+
+
+def meet_one(sym, args, stack):
+    # production: P -> S
+    sym.value = 1
+
+
+def expr_terms(depth):
+    return ['o%d' % i for i in range(depth)] + ['(', ')', 'd']
+
+
+def expr_grammar(depth):
+    # E0 -> E0 o0 E1 | E1, ..., and the last
+    # En -> ( E0 ) | d, one layer per level
+    g = Grammar(expr_terms(depth))
+    for i in range(depth):
+        name, next = 'E%d' % i, 'E%d' % (i + 1)
+        g.add_prod(name, [name, 'o%d' % i, next], meet_sum)
+        g.add_prod(name, [next], meet_first)
+    last = 'E%d' % depth
+    g.add_prod(last, ['(', 'E0', ')'], meet_second)
+    g.add_prod(last, ['d'], meet_first)
+    return g
+
+
+def flat_grammar(depth):
+    # the same language as expr_grammar, but
+    # the levels are given by add_expr
+    g = Grammar(expr_terms(depth))
+    levels = [('left', {'o%d' % i: meet_sum}) for i in range(depth)]
+    g.add_expr('E0', 'F', levels, meet_first)
+    g.add_prod('F', ['(', 'E0', ')'], meet_second)
+    g.add_prod('F', ['d'], meet_first)
+    return g
+
+
+def ll_grammar(depth):
+    # expr_grammar without the left recursion,
+    # Ei -> Ei+1 Ri, Ri -> oi Ei+1 Ri | <empty>
+    g = Grammar(expr_terms(depth))
+    for i in range(depth):
+        name, next, rest = 'E%d' % i, 'E%d' % (i + 1), 'R%d' % i
+        g.add_prod(name, [next, rest])
+        g.add_prod(rest, ['o%d' % i, next, rest])
+        g.add_prod(rest, [])
+    last = 'E%d' % depth
+    g.add_prod(last, ['(', 'E0', ')'])
+    g.add_prod(last, ['d'])
+    return g
+
+
+def stmt_terms(count):
+    return ['k%d' % i for i in range(count)] + [';', 'd', ',']
+
+
+def stmt_grammar(count):
+    # P -> P S | S, and count kinds of S, each
+    # with its own prods, to scale the prods
+    g = Grammar(stmt_terms(count))
+    g.add_prod('P', ['P', 'S'], meet_count)
+    g.add_prod('P', ['S'], meet_one)
+    for i in range(count):
+        args = 'A%d' % i
+        g.add_prod('S', ['k%d' % i, args, ';'], meet_second)
+        g.add_prod(args, [args, ',', 'd'], meet_sum)
+        g.add_prod(args, ['d'], meet_first)
+    return g
+
+
+def ambig_grammar(count):
+    # E -> E oi E | d, ambiguous, the number of
+    # trees grows as the Catalan numbers
+    g = Grammar(expr_terms(count))
+    for i in range(count):
+        g.add_prod('E', ['E', 'o%d' % i, 'E'], meet_sum)
+    g.add_prod('E', ['(', 'E', ')'], meet_second)
+    g.add_prod('E', ['d'], meet_first)
+    return g
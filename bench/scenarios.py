@@ -0,0 +1,147 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+import time
+import tracemalloc
+
+from bench import grammars, tokens
+from pslrp import CLRTable, LRParser, SLRTable, TokenColumns
+from psglrp import GLRParser
+from psllp import LLParser
+
+TABLES = {'slr': SLRTable, 'clr': CLRTable}
+GRAMMARS = {'expr': grammars.expr_grammar,
+            'flat': grammars.flat_grammar,
+            'stmt': grammars.stmt_grammar}
+
+
+def measure(setup, run, repeat=3):
+    # the best time of run(setup()), and the peak
+    # memory of one more run under tracemalloc,
+    # which is too slow to be timed at the same
+    best, result = None, None
+    for _ in range(repeat):
+        arg = setup()
+        begin = time.perf_counter()
+        result = run(arg)
+        seconds = time.perf_counter() - begin
+        if best is None or seconds < best: best = seconds
+    arg = setup()
+    tracemalloc.start()
+    run(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def record(name, seconds, peak, **fields):
+    fields.update(name=name, seconds=seconds, peak_kb=peak // 1024)
+    return fields
+
+
+def started(kind, size):
+    g = GRAMMARS[kind](size)
+    g.set_start()
+    return g
+
+
+def make_tokens(kind, size, length):
+    if kind == 'stmt':
+        return tokens.stmt_tokens(size, length)
+    return tokens.expr_tokens(size, length)
+
+
+def bench_start(kind, size, repeat=3):
+    # the first and follow sets and the items
+    run = lambda g: g.set_start()
+    _, seconds, peak = measure(lambda: GRAMMARS[kind](size), run, repeat)
+    g = started(kind, size)
+    name = 'set_start/%s/%d' % (kind, size)
+    return record(name, seconds, peak, prods=len(g) - 1)
+
+
+def bench_table(table, kind, size, repeat=3):
+    cls = TABLES[table]
+    setup = lambda: started(kind, size)
+    t, seconds, peak = measure(setup, cls, repeat)
+    name = '%s_table/%s/%d' % (table, kind, size)
+    return record(name, seconds, peak, **t.report())
+
+
+def bench_lr_parse(table, kind, size, length, repeat=3):
+    t = TABLES[table](started(kind, size))
+    source = make_tokens(kind, size, length)
+    run = lambda s: LRParser(t).parse(s)
+    _, seconds, peak = measure(lambda: list(source), run, repeat)
+    name = 'lr_parse/%s/%s/%d/%d' % (table, kind, size, length)
+    return record(name, seconds, peak, tokens=len(source),
+                  tokens_per_sec=len(source) / seconds)
+
+
+def bench_lr_columns(table, kind, size, length, repeat=3):
+    # the same tokens as columns, without the
+    # token objects of the lexer
+    t = TABLES[table](started(kind, size))
+    source = make_tokens(kind, size, length)
+    columns = TokenColumns.from_tokens(source)
+    run = lambda c: LRParser(t).parse(c)
+    _, seconds, peak = measure(lambda: columns, run, repeat)
+    name = 'lr_columns/%s/%s/%d/%d' % (table, kind, size, length)
+    return record(name, seconds, peak, tokens=len(source),
+                  tokens_per_sec=len(source) / seconds)
+
+
+def bench_ll_parse(size, length, repeat=3):
+    g = grammars.ll_grammar(size)
+    g.set_start()
+    source = tokens.expr_tokens(size, length)
+    run = lambda s: LLParser(g).parse(s)
+    _, seconds, peak = measure(lambda: list(source), run, repeat)
+    name = 'll_parse/expr/%d/%d' % (size, length)
+    return record(name, seconds, peak, tokens=len(source),
+                  tokens_per_sec=len(source) / seconds)
+
+
+def bench_glr_parse(size, length, repeat=3):
+    # the ambiguity pressure, every op of the
+    # expression makes more trees in the forest
+    g = grammars.ambig_grammar(size)
+    g.set_start()
+    t = SLRTable(g, keep_conflicts=True)
+    source = tokens.expr_tokens(size, length, nest=0)
+    run = lambda s: GLRParser(t).parse(s)
+    _, seconds, peak = measure(lambda: list(source), run, repeat)
+    name = 'glr_parse/ambig/%d/%d' % (size, length)
+    return record(name, seconds, peak, tokens=len(source),
+                  tokens_per_sec=len(source) / seconds,
+                  conflicts=t.conflicts)
+
+
+# the sizes of the scenarios at each scale
+SCALES = {
+    'small': {'sizes': [2, 4], 'stmts': [4, 16], 'length': 200,
+              'll_length': 100, 'glr_length': 15},
+    'medium': {'sizes': [4, 8], 'stmts': [16, 64], 'length': 2000,
+               'll_length': 300, 'glr_length': 25},
+    'large': {'sizes': [8, 16], 'stmts': [64, 256], 'length': 20000,
+              'll_length': 600, 'glr_length': 35},
+}
+
+
+def scenarios(scale, repeat=3):
+    # yield (<group>, <thunk>) of the scenarios
+    s = SCALES[scale]
+    for kind in GRAMMARS:
+        sizes = s['stmts'] if kind == 'stmt' else s['sizes']
+        for n in sizes:
+            yield 'set_start', lambda k=kind, n=n: bench_start(k, n, repeat)
+            for t in TABLES:
+                yield t + '_table', lambda t=t, k=kind, n=n: bench_table(
+                    t, k, n, repeat)
+                yield 'lr_parse', lambda t=t, k=kind, n=n: bench_lr_parse(
+                    t, k, n, s['length'], repeat)
+                yield 'lr_columns', lambda t=t, k=kind, n=n: (
+                    bench_lr_columns(t, k, n, s['length'], repeat))
+    for n in s['sizes']:
+        yield 'll_parse', lambda n=n: bench_ll_parse(
+            n, s['ll_length'], repeat)
+    yield 'glr_parse', lambda: bench_glr_parse(2, s['glr_length'], repeat)
@@ -0,0 +1,48 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+import random
+
+from pslrp import LRToken
+
+
+def expr_tokens(depth, length, seed=0, nest=0.1):
+    # an expression of about length tokens for
+    # the expr grammars, nest is the chance to
+    # open a parenthesis before the operand
+    r = random.Random(seed)
+    names, level = [], 0
+    while True:
+        while r.random() < nest and level < 32:
+            names.append('(')
+            level += 1
+        names.append('d')
+        while level and r.random() < nest:
+            names.append(')')
+            level -= 1
+        if len(names) + level >= length: break
+        names.append('o%d' % r.randrange(depth))
+    names.extend(')' * level)
+    return to_tokens(names, r)
+
+
+def stmt_tokens(count, length, seed=0):
+    # statements of the stmt grammar, each of
+    # them has 1 to 4 args after the keyword
+    r = random.Random(seed)
+    names = []
+    while len(names) < length:
+        names.append('k%d' % r.randrange(count))
+        names.append('d')
+        for _ in range(r.randrange(4)):
+            names.extend([',', 'd'])
+        names.append(';')
+    return to_tokens(names, r)
+
+
+def to_tokens(names, r):
+    tokens = []
+    for name in names:
+        value = r.randrange(100) if name == 'd' else None
+        tokens.append(LRToken(name, value))
+    tokens.append(LRToken('$end'))
+    return tokens
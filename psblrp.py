@@ -0,0 +1,108 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from pslrp import GramError, LRTable
+
+# the cells of dense action table:
+# shift is pos, reduce is neg, and
+# accept is 0 just as the actiondict
+ERROR = np.iinfo(np.int32).min
+
+
+class BatchRecogniser:
+    # recognise a batch of token sequences in
+    # lockstep, one action per row each step
+    def __init__(self, table: LRTable):
+        if table.conflicts:
+            message = 'Conflicts in table, use GLRParser.'
+            raise GramError(message)
+        self.table = table
+        grammar = table.grammar
+        # termid[<name>] = <column>, and the last
+        # column is for the unknown names
+        terms = list(grammar.termdict) + ['$end']
+        nonts = list(grammar.nontdict)
+        self.termid = {t: i for i, t in enumerate(terms)}
+        self.nontid = {n: i for i, n in enumerate(nonts)}
+        self.unknown = len(terms)
+        self.end = self.termid['$end']
+        states = len(table.actiondict)
+        action = np.full((states, len(terms) + 1), ERROR, np.int32)
+        goto = np.zeros((states, len(nonts)), np.int32)
+        for i, actions in table.actiondict.items():
+            for name, next in actions.items():
+                action[i, self.termid[name]] = next
+            # consistent states reduce by default
+            next = table.reducedict.get(i)
+            if next is not None:
+                action[i, :] = next
+        for i, gotos in table.gotodict.items():
+            for name, next in gotos.items():
+                goto[i, self.nontid[name]] = next
+        prodlist = table.prodlist
+        self.action = action
+        self.goto = goto
+        self.prodlen = np.array([len(p) for p in prodlist], np.intp)
+        self.prodnont = np.array([self.nontid.get(p.name, 0)
+                                  for p in prodlist], np.intp)
+
+    def encode(self, inputs):
+        # a padded matrix of the term ids, every
+        # row ends with $end even if not given
+        rows = []
+        for tokens in inputs:
+            names = [t if isinstance(t, str) else t.name for t in tokens]
+            if not names or names[-1] != '$end':
+                names.append('$end')
+            rows.append([self.termid.get(n, self.unknown) for n in names])
+        width = max((len(r) for r in rows), default=1)
+        matrix = np.full((len(rows), width), self.end, np.int32)
+        for i, r in enumerate(rows):
+            matrix[i, :len(r)] = r
+        return matrix
+
+    def recognise(self, inputs, start=None):
+        matrix = self.encode(inputs)
+        return self.recognise_matrix(matrix, start)
+
+    def recognise_matrix(self, matrix, start=None):
+        # return whether each row is accepted, the
+        # rows are dropped once accepted or refused
+        action = self.action
+        goto = self.goto
+        prodlen = self.prodlen
+        prodnont = self.prodnont
+        batch, width = matrix.shape
+        statestack = np.zeros((batch, width + 2), np.int32)
+        if start is not None:
+            statestack[:, 0] = self.table.startdict[start]
+        top = np.zeros(batch, np.intp)
+        index = np.zeros(batch, np.intp)
+        accepted = np.zeros(batch, bool)
+        rows = np.arange(batch)
+        while rows.size:
+            if top[rows].max() + 1 >= statestack.shape[1]:
+                # empty prods may make it deeper
+                grow = np.zeros_like(statestack)
+                statestack = np.concatenate([statestack, grow], axis=1)
+            state = statestack[rows, top[rows]]
+            next = action[state, matrix[rows, index[rows]]]
+            # shift rows
+            mask = next > 0
+            r = rows[mask]
+            top[r] += 1
+            statestack[r, top[r]] = next[mask]
+            index[r] += 1
+            # reduce rows
+            mask = (next < 0) & (next != ERROR)
+            r = rows[mask]
+            p = -next[mask]
+            top[r] -= prodlen[p]
+            state = goto[statestack[r, top[r]], prodnont[p]]
+            top[r] += 1
+            statestack[r, top[r]] = state
+            # accept or refuse rows
+            accepted[rows[next == 0]] = True
+            rows = rows[(next != 0) & (next != ERROR)]
+        return accepted
@@ -0,0 +1,275 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+from pslrp import (GramError, LRTable, LRToken, Production, finish_symbols,
+                   reduce_symbols)
+
+
+class SPPFNode:
+    def __init__(self, name, start, end):
+        self.name = name
+        self.start = start
+        self.end = end
+        # packed alternatives, (prod, kids)
+        self.packs = []
+        # internal variables
+        self._packkeys = set()
+
+    def __str__(self):
+        args = self.name, self.start, self.end
+        return '{}({}, {})'.format(*args)
+
+    @property
+    def is_ambiguous(self):
+        return len(self.packs) > 1
+
+    def add_pack(self, prod: Production, kids):
+        # kids are SPPF nodes or tokens, and they
+        # are shared, so compare them by identity
+        key = (prod.index,) + tuple(id(k) for k in kids)
+        if key not in self._packkeys:
+            self._packkeys.add(key)
+            self.packs.append((prod, tuple(kids)))
+
+
+class GSSNode:
+    def __init__(self, state, index):
+        self.state = state
+        self.index = index
+        # edges[<node>] = <label>
+        # label is a SPPF node or token
+        self.edges = {}
+
+    def __str__(self):
+        args = self.state, self.index
+        return '{}@{}'.format(*args)
+
+
+def count_trees(node):
+    # the number of trees packed in the forest,
+    # the cyclic derivations are not counted
+    counts = {}
+    todo = [(node, False)]
+    while todo:
+        x, ready = todo.pop()
+        if not isinstance(x, SPPFNode):
+            continue
+        if not ready:
+            if id(x) in counts: continue
+            # None marks the node in progress
+            counts[id(x)] = None
+            todo.append((x, True))
+            for _, kids in x.packs:
+                todo.extend((k, False) for k in kids)
+            continue
+        total = 0
+        for _, kids in x.packs:
+            n = 1
+            for k in kids:
+                if isinstance(k, SPPFNode):
+                    n *= counts.get(id(k)) or 0
+            total += n
+        counts[id(x)] = total
+    return counts.get(id(node), 1)
+
+
+class GLRParser:
+    def __init__(self, table: LRTable):
+        self.table = table
+        # frontier[<state>] = <node>
+        self.frontier = None
+        # forest[(<name>, <start>)] = <node>
+        self.forest = None
+        self.shifts = None
+        self.accepted = None
+        self.bottom = None
+
+    @property
+    def prodlist(self):
+        return self.table.prodlist
+
+    @property
+    def actiondict(self):
+        return self.table.actiondict
+
+    @property
+    def gotodict(self):
+        return self.table.gotodict
+
+    @property
+    def reducedict(self):
+        return self.table.reducedict
+
+    def restart(self, start=None):
+        state = 0
+        if start is not None:
+            state = self.table.startdict[start]
+        self.bottom = GSSNode(state, 0)
+        self.frontier = {state: self.bottom}
+        self.forest = {}
+
+    def actions(self, state, name):
+        next = self.reducedict.get(state)
+        if next is None:
+            action = self.actiondict[state]
+            next = action.get(name)
+        if next is None: return ()
+        if isinstance(next, tuple): return next
+        return (next,)
+
+    def symbol_node(self, name, start, end):
+        # nodes of the same symbol and span
+        # are shared in the whole level
+        node = self.forest.get((name, start))
+        if node is None:
+            node = SPPFNode(name, start, end)
+            self.forest[(name, start)] = node
+        return node
+
+    def paths(self, node, length, via=None):
+        # all the paths of the length from node,
+        # if via is given, the paths must use it
+        todo = [(node, length, (), via is None)]
+        while todo:
+            x, n, kids, used = todo.pop()
+            if n == 0:
+                if used: yield x, kids
+                continue
+            for w, label in x.edges.items():
+                u = used or (x is via[0] and w is via[1])
+                todo.append((w, n - 1, (label,) + kids, u))
+
+    def parse(self, tokens, start=None):
+        # return the root of the shared packed
+        # forest, use evaluate() for the value
+        self.restart(start)
+        for i, token in enumerate(tokens):
+            self.shifts = []
+            self.accepted = None
+            if not self.fast_reduce(i, token):
+                self.reduce_all(i, token)
+            if self.accepted is not None:
+                return self.accepted
+            self.shift_all(i, token)
+            if not self.frontier:
+                message = 'Parsing error.'
+                raise GramError(message)
+        message = 'Parsing error, perhaps %s.'
+        more_hint = 'missing the end symbol'
+        raise GramError(message % more_hint)
+
+    def accept(self, node: GSSNode):
+        # the accepting node has the edge to the
+        # bottom, labelled with the start symbol
+        for w, label in node.edges.items():
+            if w is self.bottom:
+                self.accepted = label
+
+    def fast_reduce(self, i, token):
+        # while there is only one stack and the
+        # actions are deterministic, act just as
+        # what the LR parser does on its stack
+        prodlist = self.prodlist
+        gotodict = self.gotodict
+        while len(self.frontier) == 1:
+            for x in self.frontier.values(): break
+            next = self.actions(x.state, token.name)
+            if len(next) != 1: return False
+            next = next[0]
+            if next > 0:
+                self.shifts.append((x, next))
+                return True
+            elif next == 0:
+                self.accept(x)
+                return True
+            p = prodlist[-next]
+            w, kids = x, ()
+            for _ in range(len(p)):
+                if len(w.edges) != 1: return False
+                for w, label in w.edges.items(): break
+                kids = (label,) + kids
+            s = gotodict[w.state][p.name]
+            if s == x.state: return False
+            sppf = self.symbol_node(p.name, w.index, i)
+            sppf.add_pack(p, kids)
+            u = GSSNode(s, i)
+            u.edges[w] = sppf
+            self.frontier = {s: u}
+        return False
+
+    def reduce_all(self, i, token):
+        # Tomita's algorithm, with the reductions
+        # redone on edges added to acted nodes
+        todo = list(self.frontier.values())
+        done = []
+        while todo:
+            x = todo.pop()
+            done.append(x)
+            for next in self.actions(x.state, token.name):
+                if next > 0:
+                    self.shifts.append((x, next))
+                elif next < 0:
+                    p = self.prodlist[-next]
+                    for w, kids in list(self.paths(x, len(p))):
+                        self.reducer(i, token, w, p, kids, todo, done)
+                else:
+                    self.accept(x)
+
+    def reducer(self, i, token, w, p, kids, todo, done):
+        s = self.gotodict[w.state][p.name]
+        sppf = self.symbol_node(p.name, w.index, i)
+        sppf.add_pack(p, kids)
+        u = self.frontier.get(s)
+        if u is None:
+            u = GSSNode(s, i)
+            u.edges[w] = sppf
+            self.frontier[s] = u
+            todo.append(u)
+        elif w not in u.edges:
+            u.edges[w] = sppf
+            # the new edge makes new paths for
+            # the nodes those have been acted
+            for x in list(done):
+                for next in self.actions(x.state, token.name):
+                    if next >= 0: continue
+                    q = self.prodlist[-next]
+                    if not len(q): continue
+                    for v, k in list(self.paths(x, len(q), (u, w))):
+                        self.reducer(i, token, v, q, k, todo, done)
+
+    def shift_all(self, i, token):
+        frontier = {}
+        for x, s in self.shifts:
+            u = frontier.get(s)
+            if u is None:
+                u = GSSNode(s, i + 1)
+                frontier[s] = u
+            u.edges[x] = token
+        self.frontier = frontier
+        self.forest = {}
+
+    def evaluate(self, node, choose=None):
+        # replay the reductions of one tree in the
+        # forest, choose(node) picks the packed
+        # alternative for an ambiguous node
+        symbolstack = [LRToken('$end')]
+        todo = [node]
+        while todo:
+            x = todo.pop()
+            if isinstance(x, Production):
+                reduce_symbols(symbolstack, x, self.prodlist)
+            elif isinstance(x, SPPFNode):
+                if not x.is_ambiguous:
+                    p, kids = x.packs[0]
+                elif choose is not None:
+                    p, kids = x.packs[choose(x)]
+                else:
+                    message = 'Ambiguous parse: %s.'
+                    raise GramError(message % x)
+                todo.append(p)
+                todo.extend(reversed(kids))
+            else:
+                symbolstack.append(x)
+        finish_symbols(symbolstack, 1, self.prodlist)
+        symbol = symbolstack[-1]
+        return symbol.value
+
@@ -0,0 +1,196 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+from pslrp import GramError, LRTable, Production
+
+
+class IncNode:
+    def __init__(self, name, prod: Production = None, kids=(),
+                 token=None, state=0):
+        self.name = name
+        self.prod = prod
+        self.kids = kids
+        self.token = token
+        # the state pushed with the node,
+        # which never changes after edits
+        self.state = state
+        self.parent = None
+        # the number of tokens in the node
+        if prod is None:
+            self.size = 1
+        else:
+            self.size = sum(k.size for k in kids)
+
+    def __str__(self):
+        if self.prod is None: return str(self.token)
+        return str(self.prod)
+
+    @property
+    def is_token(self):
+        return self.prod is None
+
+    def leaves(self):
+        todo = [self]
+        while todo:
+            node = todo.pop()
+            if node.prod is None:
+                yield node
+            else:
+                todo.extend(reversed(node.kids))
+
+
+def spine(root: IncNode, index):
+    # the stack right after shifting the token
+    # at index, as (parent, i) of the cells,
+    # and the path from the root to the leaf
+    cells, path = [], []
+    node, offset = root, 0
+    while node.prod is not None:
+        path.append(node)
+        for i, kid in enumerate(node.kids):
+            if offset + kid.size > index: break
+            # the left siblings are all reduced
+            cells.append((node, i))
+            offset += kid.size
+        else:
+            message = 'Token index out of range: %d.'
+            raise GramError(message % index)
+        last, node = (node, i), kid
+    cells.append(last)
+    return cells, path
+
+
+class IncLRParser:
+    # parse into a tree of IncNode without any
+    # semantic action, and reparse only around
+    # the edits of the tokens after that
+    def __init__(self, table: LRTable):
+        if table.conflicts:
+            message = 'Conflicts in table, use GLRParser.'
+            raise GramError(message)
+        if table.grammar.exprdict:
+            # the nodes are the cells of the stack,
+            # which the ops by precedence are not
+            message = 'Expression chains in grammar, use LRParser.'
+            raise GramError(message)
+        self.table = table
+        self.tokens = None
+        self.root = None
+
+    @property
+    def prodlist(self):
+        return self.table.prodlist
+
+    @property
+    def actiondict(self):
+        return self.table.actiondict
+
+    @property
+    def gotodict(self):
+        return self.table.gotodict
+
+    @property
+    def reducedict(self):
+        return self.table.reducedict
+
+    def parse(self, tokens):
+        tokens = list(tokens)
+        root = self.run([0], [], tokens, 0)
+        self.tokens = tokens
+        self.root = root
+        return root
+
+    def edit(self, start, end, tokens):
+        # replace self.tokens[start:end] with the
+        # tokens, and update the tree in place
+        old = self.tokens
+        new = old[:start] + list(tokens) + old[end:]
+        delta = len(new) - len(old)
+        stop = start + len(tokens)
+        if start > 0:
+            # resume right after shifting the
+            # token before the edit, which is
+            # not affected by the edit at all
+            cells, _ = spine(self.root, start - 1)
+            nodestack = [p.kids[i] for p, i in cells]
+            statestack = [0] + [n.state for n in nodestack]
+        else:
+            nodestack = []
+            statestack = [0]
+
+        def resync(index, statestack, nodestack):
+            # the parse is the same as the old one
+            # once the stacks after shifting the
+            # same token in the suffix are equal
+            o = index - delta
+            if index < stop or o >= len(old): return False
+            cells, path = spine(self.root, o)
+            if len(cells) + 1 != len(statestack): return False
+            p, i = cells[-1]
+            if p.kids[i].state != statestack[-1]: return False
+            for (p, i), s in zip(cells, statestack[1:]):
+                if p.kids[i].state != s: return False
+            # splice the new cells into the old tree,
+            # the ancestors of the cells are reused
+            for (p, i), n in zip(cells, nodestack):
+                if p.kids[i] is not n:
+                    p.kids[i] = n
+                    n.parent = p
+            for node in reversed(path):
+                node.size = sum(k.size for k in node.kids)
+            return True
+
+        root = self.run(statestack, nodestack, new, start, resync)
+        self.tokens = new
+        if root is not None: self.root = root
+        return self.root
+
+    def run(self, statestack, nodestack, tokens, index, resync=None):
+        # return the root, or None if it resyncs
+        prodlist = self.prodlist
+        actiondict = self.actiondict
+        reducedict = self.reducedict
+        gotodict = self.gotodict
+        created = []
+        while True:
+            state = statestack[-1]
+            next = reducedict.get(state)
+            if next is None:
+                next_sym = tokens[index]
+                action = actiondict[state]
+                next = action.get(next_sym.name)
+            if next is None:
+                message = 'Parsing error.'
+                raise GramError(message)
+            if next > 0:
+                token = tokens[index]
+                node = IncNode(token.name, None, (), token, next)
+                statestack.append(next)
+                nodestack.append(node)
+                if resync is not None:
+                    if resync(index, statestack, nodestack):
+                        root = None
+                        break
+                index += 1
+            elif next < 0:
+                p = prodlist[-next]
+                kids = []
+                if len(p):
+                    kids = nodestack[-len(p):]
+                    del nodestack[-len(p):]
+                    del statestack[-len(p):]
+                r_goto = gotodict[statestack[-1]]
+                next_state = r_goto[p.name]
+                node = IncNode(p.name, p, kids, None, next_state)
+                created.append(node)
+                statestack.append(next_state)
+                nodestack.append(node)
+            elif next == 0:
+                root = nodestack[-1]
+                root.parent = None
+                break
+        # set the parents only after success,
+        # the old tree is intact on any error
+        for node in created:
+            for k in node.kids:
+                k.parent = node
+        return root
@@ -1,8 +1,9 @@
 #!/usr/bin/env/python3
 # -*- coding: utf-8 -*-
+from time import perf_counter
 from typing import Dict, Iterable
 
-from pslrp import GramError, Grammar, Production
+from pslrp import GramError, Grammar, ParseStats, ParsingError, Production
 
 
 class LLToken:
@@ -30,6 +31,14 @@ class LLParser:
     def __init__(self, grammar: Grammar):
         self.grammar = grammar
         self.funcdict = {}
+        # collect the errors instead of raising
+        self.recovery = False
+        self.syncset = set()
+        self.errors = []
+        self.total = 0
+        # see set_stats()
+        self.stats = None
+        self.depth = 0
         for t in self.termdict:
             self.term_func(t)
         for n in self.nontdict:
@@ -68,6 +77,10 @@ class LLParser:
                 raise GramError(message % more_hint)
             if tokens[0].name == sym:
                 return tokens[1:]
+            if self.recovery:
+                # as if the missing term is inserted
+                self.add_error(tokens, [sym])
+                return tokens
             message = 'Parsing error.'
             raise GramError(message)
         self.funcdict[sym] = _func
@@ -82,28 +95,118 @@ class LLParser:
                 message = 'Parsing error, perhaps %s.'
                 more_hint = 'missing the end symbol'
                 raise GramError(message % more_hint)
-            for p in self.proddict[sym]:
-                first = self.get_first(p.syms)
-                if tokens[0].name in first:
-                    for i, s in enumerate(p.syms):
-                        p.functions[i](new, old)
-                        f = self.funcdict[s]
-                        tokens = f(tokens, new)
-                    p.functions[-1](new, old)
+            while True:
+                for p in self.proddict[sym]:
+                    first = self.get_first(p.syms)
+                    if tokens[0].name in first:
+                        for i, s in enumerate(p.syms):
+                            p.functions[i](new, old)
+                            f = self.funcdict[s]
+                            tokens = f(tokens, new)
+                        p.functions[-1](new, old)
+                        return tokens
+                follow = self.follow[sym]
+                if tokens[0].name in follow:
+                    p = get_empty_prod(self.proddict, sym)
+                    if p is not None:
+                        p.functions[-1](new, old)
+                        return tokens
+                    if not self.recovery:
+                        message = 'Conflict error on parsing.'
+                        raise GramError(message)
+                    # as if the nonterm is derived
+                    self.add_error(tokens, self.get_first([sym]))
+                    return tokens
+                if not self.recovery:
+                    message = 'Parsing error.'
+                    raise GramError(message)
+                tokens = self.recover(tokens, sym)
+                if tokens[0].name not in self.get_first([sym]):
                     return tokens
-            follow = self.follow[sym]
-            if tokens[0].name in follow:
-                p = get_empty_prod(self.proddict, sym)
-                message = 'Conflict error on parsing.'
-                if p is None: raise GramError(message)
-                p.functions[-1](new, old)
-                return tokens
-            message = 'Parsing error.'
-            raise GramError(message)
         self.funcdict[sym] = _func
         return self.funcdict[sym]
 
+    def set_stats(self, stats: ParseStats = None):
+        # count the matched terms and the derived
+        # prods into the stats, with the depth of
+        # the calls, by wrapping the funcs, so it
+        # costs nothing when stats is None
+        self.stats = stats
+        self.funcdict = {}
+        for t in self.termdict:
+            self.term_func(t)
+        for n in self.nontdict:
+            self.nont_func(n)
+        if stats is not None:
+            for sym, func in list(self.funcdict.items()):
+                self.funcdict[sym] = self.traced_func(sym, func)
+        return stats
+
+    def select(self, sym, tokens):
+        # the prod which nont_func derives
+        for p in self.proddict[sym]:
+            if tokens[0].name in self.get_first(p.syms):
+                return p
+        return get_empty_prod(self.proddict, sym)
+
+    def traced_func(self, sym, func):
+        stats = self.stats
+        is_term = sym in self.termdict
+        def _func(tokens, old):
+            self.depth += 1
+            depth = self.depth
+            p = None
+            if tokens and not is_term:
+                p = self.select(sym, tokens)
+            begin = perf_counter()
+            try:
+                tokens = func(tokens, old)
+            finally:
+                self.depth -= 1
+            if is_term:
+                stats.shift(sym, depth)
+            elif p is not None:
+                # the seconds of the whole derivation
+                stats.reduce(p, sym, perf_counter() - begin)
+                if depth > stats.max_depth: stats.max_depth = depth
+            return tokens
+        return _func
+
+    def set_recovery(self, sync=None):
+        # parse() goes on after errors with the
+        # sync terms and the first/follow sets,
+        # and collects all errors in self.errors
+        if sync is None:
+            sync = self.grammar.syncset
+        self.recovery = True
+        self.syncset = set(sync)
+
+    def add_error(self, tokens, expected):
+        position = self.total - len(tokens)
+        # only one error for each position
+        if self.errors and self.errors[-1].position == position:
+            return
+        expected = sorted(set(expected) - {'<empty>'})
+        error = ParsingError(position, tokens[0], expected)
+        self.errors.append(error)
+
+    def recover(self, tokens, sym):
+        # panic mode, discard tokens until the one
+        # in the first or follow set of sym, or a
+        # sync term, but never discard the $end
+        first = self.get_first([sym])
+        self.add_error(tokens, first + self.follow[sym])
+        stopset = set(first) | set(self.follow[sym])
+        stopset |= self.syncset
+        stopset.add('$end')
+        while tokens[0].name not in stopset:
+            tokens = tokens[1:]
+        return tokens
+
     def parse(self, tokens, result=None):
         if result is None: result = {}
+        self.errors = []
+        self.total = len(tokens)
+        self.depth = 0
         func = self.funcdict[self.start]
         return func(tokens, result)
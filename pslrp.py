@@ -1,21 +1,36 @@
 #!/usr/bin/env/python3
 # -*- coding: utf-8 -*-
-from collections import defaultdict
+import os
+import pickle
+import sys
+import zlib
+from array import array
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import suppress
 from copy import deepcopy
+from hashlib import sha1
+from time import perf_counter
 from typing import Iterable
 
 
 class Production:
+    __slots__ = ('index', 'name', 'syms', 'func', 'lr_next', 'lr_items',
+                 'uni_syms', 'prec', '_add_count')
+
     def __init__(self, index, name, syms, func=None):
         self.index = index
         self.name = name
-        self.syms = syms
+        # shared by all the items of the prod
+        self.syms = tuple(syms)
         self.func = func
         self.lr_next = None
         self.lr_items = None
         # all symbols in the production
-        self.uni_syms = list(set(syms))
+        self.uni_syms = tuple(set(syms))
+        # (<level>, <right assoc>) for the ops
+        # of the expression nonterms
+        self.prec = None
         # internal variables
         self._add_count = 0
 
@@ -46,6 +61,19 @@ class GramError(Exception):
         super().__init__(message)
 
 
+class ParsingError(GramError):
+    def __init__(self, position, token, expected):
+        message = 'Parsing error at %d: %s.'
+        super().__init__(message % (position, token))
+        self.position = position
+        self.token = token
+        self.expected = expected
+
+    def __reduce__(self):
+        args = self.position, self.token, self.expected
+        return type(self), args
+
+
 def is_legal_symbol(sym):
     # all syms are legal except below
     if sym == '<empty>': return False
@@ -55,6 +83,10 @@ def is_legal_symbol(sym):
 
 
 class Grammar:
+    __slots__ = ('start', 'prodlist', 'proddict', 'termdict', 'nontdict',
+                 'first', 'follow', 'syncset', 'entrydict', 'changelog',
+                 'exprdict', '_add_count')
+
     def __init__(self, terms):
         self.start = None
         self.prodlist = [None]
@@ -63,6 +95,17 @@ class Grammar:
         self.nontdict = defaultdict(list)
         self.first = defaultdict(list)
         self.follow = defaultdict(list)
+        # terms to synchronise the parse on
+        self.syncset = set()
+        # entrydict[<name>] = <prod S' -> name>
+        self.entrydict = {}
+        # the nonterms changed by the prods
+        # added after set_start, for tables
+        self.changelog = []
+        # exprdict[<name>] = <operand>
+        self.exprdict = {}
+        # internal variables
+        self._add_count = 0
         for t in terms: self.termdict[t] = []
 
     def __len__(self):
@@ -75,6 +118,14 @@ class Grammar:
         string = [str(x) for x in self.prodlist]
         return '\n'.join(string)
 
+    @property
+    def fingerprint(self):
+        # identify the grammar by its symbols
+        # and prods, but not by the functions
+        prods = [(p.name, p.syms) for p in self.prodlist if p]
+        text = repr((sorted(self.termdict), self.start, prods))
+        return sha1(text.encode()).hexdigest()
+
     def add_prod(self, name, syms, func=None):
         if name in self.termdict:
             text = 'Illegal nonterm: %s'
@@ -94,29 +145,171 @@ class Grammar:
         _ = self.nontdict[name]
         for each in syms:
             if each in self.termdict:
-                self.termdict[each].append(i)
+                indexes = self.termdict[each]
             else:
-                self.nontdict[each].append(i)
+                indexes = self.nontdict[each]
+            # once for the syms used twice
+            if not indexes or indexes[-1] != i:
+                indexes.append(i)
         # build a production and update self
         prod = Production(i, name, syms, func)
         self.prodlist.append(prod)
         self.proddict[name].append(prod)
+        if self.start is not None:
+            # keep the sets and items up to date,
+            # then LRTable.update() the tables
+            self.build_prod_items(prod)
+            self.update_sets(prod)
+
+    def add_expr(self, name, operand, levels, func=None):
+        # name -> operand | name op operand, levels
+        # are from the lowest, each of them is like
+        # ('left', {'+': <func>, '-': <func>}), the
+        # table sees a flat chain of the operands,
+        # and the parser applies ops by precedence
+        for assoc, ops in levels:
+            if assoc not in ('left', 'right'):
+                text = 'Illegal assoc: %s'
+                raise GramError(text % assoc)
+            for op in ops:
+                if op not in self.termdict:
+                    text = 'Illegal op: %s'
+                    raise GramError(text % op)
+        self.add_prod(name, [operand], func)
+        for level, (assoc, ops) in enumerate(levels):
+            for op, f in ops.items():
+                self.add_prod(name, [name, op, operand], f)
+                self.prodlist[-1].prec = level, assoc == 'right'
+        self.exprdict[name] = operand
+
+    def set_sync(self, terms):
+        # declare the terms which end the items
+        # of the top-level list, e.g. ';'
+        for t in terms:
+            if t not in self.termdict:
+                text = 'Illegal sync: %s'
+                raise GramError(text % t)
+        self.syncset = set(terms)
+
+    def nullable_set(self):
+        # the nonterms deriving the empty string
+        nullable = set()
+        been_changed = True
+        while been_changed:
+            been_changed = False
+            for n in self.nontdict:
+                if n in nullable: continue
+                for p in self.proddict[n]:
+                    if all(s in nullable for s in p.syms):
+                        been_changed = True
+                        nullable.add(n)
+                        break
+        return nullable
 
-    def set_start(self, start=None):
+    def productive_set(self):
+        # the nonterms deriving some term string
+        productive = set()
+        been_changed = True
+        while been_changed:
+            been_changed = False
+            for n in self.nontdict:
+                if n in productive: continue
+                for p in self.proddict[n]:
+                    if all(s in self.termdict or s in productive
+                           for s in p.syms):
+                        been_changed = True
+                        productive.add(n)
+                        break
+        return productive
+
+    def reachable_set(self, roots, prods=None):
+        # the symbols in the sentential forms of the
+        # roots, using only the prods if given
+        if prods is None: prods = self.prodlist[1:]
+        proddict = defaultdict(list)
+        for p in prods: proddict[p.name].append(p)
+        reachable = set(roots)
+        todo = list(roots)
+        while todo:
+            for p in proddict[todo.pop()]:
+                for s in p.syms:
+                    if s not in reachable:
+                        reachable.add(s)
+                        todo.append(s)
+        return reachable
+
+    def prune(self, start=None, entries=()):
+        # strip the prods using the nonterms which
+        # derive no term string, and then the prods
+        # unreachable from the start and entries,
+        # before set_start, and return what it did
+        if self.start is not None:
+            message = 'Prune before set_start.'
+            raise GramError(message)
         if start is None:
             start = self.prodlist[1].name
-        if start not in self.nontdict:
-            text = 'Illegal start: %s'
-            raise GramError(text % start)
+        roots = [start, *entries]
+        productive = self.productive_set()
+        for each in roots:
+            if each not in productive:
+                text = 'Unproductive start: %s'
+                raise GramError(text % each)
+        prods = [p for p in self.prodlist[1:] if p.name in productive and
+                 all(s in self.termdict or s in productive for s in p.syms)]
+        reachable = self.reachable_set(roots, prods)
+        kept = [p for p in prods if p.name in reachable]
+        keptset = set(kept)
+        report = {'nullable': sorted(self.nullable_set()),
+                  'unproductive': sorted(set(self.nontdict) - productive),
+                  'unreachable': sorted(productive - reachable),
+                  'prods': [str(p) for p in self.prodlist[1:]
+                            if p not in keptset]}
+        if len(kept) == len(self.prodlist) - 1: return report
+        # add the kept prods again to renumber them
+        terms = list(self.termdict)
+        exprdict = self.exprdict
+        self.prodlist = [None]
+        self.proddict = defaultdict(list)
+        self.termdict = defaultdict(list)
+        self.nontdict = defaultdict(list)
+        self.exprdict = {}
+        for t in terms: self.termdict[t] = []
+        for p in kept:
+            self.add_prod(p.name, p.syms, p.func)
+            self.prodlist[-1].prec = p.prec
+        for name, operand in exprdict.items():
+            if name in reachable: self.exprdict[name] = operand
+        return report
+
+    def set_start(self, start=None, entries=(), stats=None):
+        # entries are the other nonterms to start
+        # with, they share the same LR automaton,
+        # stats is a BuildStats to time the phases
+        if start is None:
+            start = self.prodlist[1].name
+        for each in [start, *entries]:
+            if each not in self.nontdict:
+                text = 'Illegal start: %s'
+                raise GramError(text % each)
         self.prodlist[0] = Production(0, "S'", [start])
         self.nontdict[start].append(0)
+        self.entrydict[start] = self.prodlist[0]
         self.start = start
+        for each in entries:
+            if each in self.entrydict: continue
+            # S' -> each, never to be reduced
+            i = len(self.prodlist)
+            prod = Production(i, "S'", [each])
+            self.prodlist.append(prod)
+            self.nontdict[each].append(i)
+            self.entrydict[each] = prod
+        if stats is None: stats = BuildStats()
         # compute first set
         # and follow set btw
-        self.first_set()
-        self.follow_set()
+        stats.timed('first', self.first_set)
+        stats.timed('follow', self.follow_set)
         # and all the LR items
-        self.build_lr_items()
+        stats.timed('lr_items', self.build_lr_items)
 
     def get_first(self, syms):
         result = []
@@ -162,73 +355,156 @@ class Grammar:
             self.follow[n] = []
         # follow(start) contains $end
         self.follow[start] = ['$end']
+        for each in self.entrydict:
+            if '$end' not in self.follow[each]:
+                self.follow[each].append('$end')
         been_changed = True
         while been_changed:
             been_changed = False
             for p in self.prodlist[1:]:
-                for i, s in enumerate(p.syms):
-                    follows_empty = False
-                    if s in self.nontdict:
-                        # now we have found a vn in a production
-                        # get the first set and set the follow set
-                        for f in self.get_first(p.syms[i + 1:]):
-                            if f == '<empty>':
-                                follows_empty = True
-                            elif f not in self.follow[s]:
-                                been_changed = True
-                                self.follow[s].append(f)
-                        # if the first set contains empty
-                        # or the vn the the last of syms
-                        # add follow(p.name) to the follow
-                        if follows_empty or i == (len(p.syms) - 1):
-                            for f in self.follow[p.name]:
-                                if f not in self.follow[s]:
-                                    been_changed = True
-                                    self.follow[s].append(f)
+                if self.follow_prod(p):
+                    been_changed = True
         # after generation
         # return the follow
         return self.follow
 
+    def follow_prod(self, p):
+        # add what the prod implies to the follow
+        # sets, and return the nonterms changed
+        changed = []
+        for i, s in enumerate(p.syms):
+            follows_empty = False
+            if s in self.nontdict:
+                # now we have found a vn in a production
+                # get the first set and set the follow set
+                for f in self.get_first(p.syms[i + 1:]):
+                    if f == '<empty>':
+                        follows_empty = True
+                    elif f not in self.follow[s]:
+                        changed.append(s)
+                        self.follow[s].append(f)
+                # if the first set contains empty
+                # or the vn the the last of syms
+                # add follow(p.name) to the follow
+                if follows_empty or i == (len(p.syms) - 1):
+                    for f in self.follow[p.name]:
+                        if f not in self.follow[s]:
+                            changed.append(s)
+                            self.follow[s].append(f)
+        return changed
+
+    def update_sets(self, prod):
+        # the first and follow sets only grow with
+        # new prods, so propagate from the new one
+        # instead of computing them from scratch
+        changed = []
+        todo = [prod]
+        while todo:
+            p = todo.pop()
+            if p.name == "S'": continue
+            grown = False
+            for f in self.get_first(p.syms):
+                if f not in self.first[p.name]:
+                    grown = True
+                    self.first[p.name].append(f)
+            if grown:
+                changed.append(p.name)
+                # the prods using it may grow too
+                for i in self.nontdict[p.name]:
+                    todo.append(self.prodlist[i])
+        # the follow sets depend on the first sets,
+        # so redo the prods using changed nonterms
+        todo = [prod]
+        for n in changed:
+            todo.extend(self.prodlist[i] for i in self.nontdict[n])
+        while todo:
+            p = todo.pop()
+            if p.name == "S'": continue
+            for s in set(self.follow_prod(p)):
+                # the follow of the name flows
+                # into the tails of its prods
+                todo.extend(self.proddict[s])
+        self.changelog.append(prod.name)
+        self.changelog.extend(changed)
+
+    def build_prod_items(self, p):
+        last, i = p, 0
+        p.lr_items = []
+        while True:
+            if i > len(p):
+                item = None
+            else:
+                item = LRItem(p, i)
+                item.lr_after = []
+                item.lr_before = None
+                with suppress(IndexError, KeyError):
+                    # lr_after is the list of productions following
+                    item.lr_after = self.proddict[p.syms[i]]
+                with suppress(IndexError):
+                    # lr_before is the symbol before
+                    # if item is the first, the last
+                    item.lr_before = p.syms[i - 1]
+            last.lr_next = item
+            if item is None: break
+            p.lr_items.append(item)
+            last, i = item, i + 1
+
     def build_lr_items(self):
         for p in self.prodlist:
-            last, i = p, 0
-            p.lr_items = []
-            while True:
-                if i > len(p):
-                    item = None
-                else:
-                    item = LRItem(p, i)
-                    item.lr_after = []
-                    item.lr_before = None
-                    with suppress(IndexError, KeyError):
-                        # lr_after is the list of productions following
-                        item.lr_after = self.proddict[item.syms[i + 1]]
-                    with suppress(IndexError):
-                        # lr_before is the symbol before
-                        # if item is the first, the last
-                        item.lr_before = item.syms[i - 1]
-                last.lr_next = item
-                if item is None: break
-                p.lr_items.append(item)
-                last, i = item, i + 1
+            self.build_prod_items(p)
+
+    def compile(self):
+        return CompiledGrammar(self)
+
+
+class CompiledGrammar:
+    # the read-only part of a grammar that the
+    # parsers use, without the sets and items
+    __slots__ = ('start', 'prodlist', 'termdict', 'nontdict', 'syncset',
+                 'entrydict', 'exprdict', 'fingerprint')
+
+    def __init__(self, grammar: Grammar):
+        self.start = grammar.start
+        self.prodlist = []
+        for p in grammar.prodlist:
+            prod = Production(p.index, p.name, p.syms, p.func)
+            prod.prec = p.prec
+            self.prodlist.append(prod)
+        self.termdict = dict.fromkeys(grammar.termdict, ())
+        self.nontdict = dict.fromkeys(grammar.nontdict, ())
+        self.syncset = frozenset(grammar.syncset)
+        entries = grammar.entrydict.items()
+        self.entrydict = {n: self.prodlist[p.index] for n, p in entries}
+        self.exprdict = dict(grammar.exprdict)
+        self.fingerprint = grammar.fingerprint
+
+    def __len__(self):
+        return len(self.prodlist)
+
+    def __getitem__(self, i):
+        return self.prodlist[i]
+
+    def __str__(self):
+        string = [str(x) for x in self.prodlist]
+        return '\n'.join(string)
 
 
 class LRItem:
+    # the prod with the dot before its symbol at
+    # lr_index, and the syms are not copied
+    __slots__ = ('prod', 'lr_index', 'lr_next', 'lr_after', 'lr_before',
+                 'lr_aheads')
+
     def __init__(self, prod: Production, lr_index):
         self.prod = prod
         self.lr_index = lr_index
-        syms = list(prod.syms)
-        syms.insert(lr_index, '.')
-        self.syms = tuple(syms)
         self.lr_next = None
         self.lr_after = None
         self.lr_before = None
         self.lr_aheads = None
-        # internal variables
-        self._add_count = 0
 
     def __len__(self):
-        return len(self.syms)
+        return len(self.prod.syms) + 1
 
     def __str__(self):
         syms = '\40'.join(self.syms)
@@ -237,13 +513,29 @@ class LRItem:
         return '%s %s' % (prod, self.lr_aheads)
 
     def __hash__(self):
-        a = self.lr_aheads or []
-        c = list(self.syms) + a
-        return hash(tuple(c))
+        # the name tells S -> a. from B -> a.
+        a = self.lr_aheads or ()
+        prod = self.prod
+        return hash((prod.name, prod.syms, self.lr_index, *a))
 
     def __eq__(self, item):
         return hash(self) == hash(item)
 
+    @property
+    def syms(self):
+        # the syms with the dot, for printing
+        syms = self.prod.syms
+        i = self.lr_index
+        return syms[:i] + ('.',) + syms[i:]
+
+    @property
+    def next_sym(self):
+        # the symbol right after the dot
+        syms = self.prod.syms
+        if self.lr_index < len(syms):
+            return syms[self.lr_index]
+        return None
+
     @property
     def index(self):
         return self.prod.index
@@ -275,7 +567,13 @@ class LRItem:
         return len(self) == self.lr_index + 1
 
     def copy(self, lr_aheads=None):
-        item = deepcopy(self)
+        # the copy shares the prod and the other
+        # items, so it sees the prods added later
+        item = LRItem(self.prod, self.lr_index)
+        item.lr_next = self.lr_next
+        item.lr_after = self.lr_after
+        item.lr_before = self.lr_before
+        item.lr_aheads = self.lr_aheads
         if lr_aheads is not None:
             # keep the lr_aheads when
             # the lr_aheads not given
@@ -296,33 +594,264 @@ def unique_symbols(items: Iterable[LRItem], reverse=False):
     return tuple(sorted(set(syms), reverse=reverse))
 
 
+class BuildStats:
+    # what the grammar and the tables do while
+    # being built, the times of nested phases
+    # are inclusive, e.g. goto has the closure
+    def __init__(self):
+        # timedict[<phase>] = <seconds>
+        self.timedict = defaultdict(float)
+        # countdict[<counter>] = <count>
+        self.countdict = defaultdict(int)
+
+    def timed(self, phase, func, *args):
+        begin = perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.timedict[phase] += perf_counter() - begin
+
+    def traced(self, phase, func, cache=None):
+        # count the calls, and the hits and misses
+        # of the cache func fills when it misses
+        def _func(*args):
+            size = len(cache) if cache is not None else 0
+            result = self.timed(phase, func, *args)
+            self.count(phase, result)
+            if cache is not None:
+                hit = len(cache) == size
+                self.countdict[phase + '_hits' if hit else
+                               phase + '_misses'] += 1
+            return result
+        return _func
+
+    def count(self, phase, result):
+        self.countdict[phase + '_calls'] += 1
+        if phase == 'closure':
+            self.countdict['closure_items'] += len(result)
+            for item in result:
+                if item.lr_aheads is not None:
+                    self.countdict['lookaheads'] += len(item.lr_aheads)
+        elif phase == 'states':
+            self.countdict['states'] += len(result)
+
+    def __str__(self):
+        lines = ['%-16s %10.6fs' % x for x in self.timedict.items()]
+        lines.extend('%-16s %10d' % x for x in self.countdict.items())
+        return '\n'.join(lines)
+
+
 class LRTable:
-    def __init__(self, grammar: Grammar):
+    # the prefix of the methods to be traced
+    kind = None
+
+    def __init__(self, grammar: Grammar, keep_conflicts=False, stats=None):
         self.grammar = grammar
+        # keep conflict cells as tuples
+        # of actions for the GLR parser
+        self.keep_conflicts = keep_conflicts
+        self.conflicts = 0
         self.actiondict = {}
         self.gotodict = {}
+        # states with a default reduce
+        self.reducedict = {}
+        # startdict[<entry>] = <initial state>
+        self.startdict = {}
         # incomplete tables
         self.actioncache = defaultdict(dict)
         self.gotocache = defaultdict(dict)
         self.closcache = defaultdict(int)
+        # kernelcache[<kernel>] = <closure>
+        # kept by update() if not affected
+        self.kernelcache = {}
+        self.logindex = len(grammar.changelog)
+        # termid[<name>] = <column>, and the rows
+        # of actions by columns, see build_rows()
+        self.termid = None
+        self.actionrows = None
         # internal variables
         self._add_count = 0
+        self._fingerprint = None
+        self.set_stats(stats)
 
     @property
     def prodlist(self):
         return self.grammar.prodlist
 
+    @property
+    def fingerprint(self):
+        # the states of SLR and CLR differ
+        # even though the grammar is same
+        if self._fingerprint is None:
+            text = type(self).__name__ + self.grammar.fingerprint
+            self._fingerprint = sha1(text.encode()).hexdigest()
+        return self._fingerprint
+
     def get_first(self, syms):
         return self.grammar.get_first(syms)
 
+    def set_stats(self, stats: BuildStats = None):
+        # time and count the closures, the gotos,
+        # the kernels and the states of the later
+        # builds, by wrapping the methods, so it
+        # costs nothing when stats is None
+        self.stats = stats
+        caches = {'closure': None, 'goto': self.gotocache,
+                  'kernel': self.kernelcache, 'items': None}
+        for phase, cache in caches.items():
+            name = '%s_%s' % (self.kind, phase)
+            self.__dict__.pop(name, None)
+            if stats is None: continue
+            func = getattr(self, name)
+            if phase == 'items': phase = 'states'
+            setattr(self, name, stats.traced(phase, func, cache))
+        return stats
+
+    def __getstate__(self):
+        # the traced methods are local functions,
+        # which can not be pickled for the workers
+        state = dict(self.__dict__)
+        for phase in ('closure', 'goto', 'kernel', 'items'):
+            state.pop('%s_%s' % (self.kind, phase), None)
+        state['stats'] = None
+        return state
+
+    def report(self):
+        # the sizes of the table, bytes is what the
+        # dicts take, and dense_bytes is for 16-bit
+        # arrays of all the cells, as in psblrp
+        rows = [self.actiondict, self.gotodict, self.reducedict]
+        cells = 0
+        size = sum(sys.getsizeof(r) for r in rows)
+        for row in self.actiondict.values():
+            size += sys.getsizeof(row)
+            for a in row.values():
+                cells += 1
+                if isinstance(a, tuple): size += sys.getsizeof(a)
+        gotos = 0
+        for row in self.gotodict.values():
+            size += sys.getsizeof(row)
+            gotos += len(row)
+        width = len(self.grammar.termdict) + len(self.grammar.nontdict) + 1
+        return {'states': len(self.actiondict),
+                'action_cells': cells,
+                'goto_cells': gotos,
+                'default_reduces': len(self.reducedict),
+                'conflicts': self.conflicts,
+                'bytes': size,
+                'dense_bytes': 2 * width * len(self.actiondict)}
+
+    def update(self):
+        # rebuild the table after Grammar.add_prod,
+        # only the closures using the changed nonterms
+        # are recomputed, the others are kept as is
+        if isinstance(self.grammar, CompiledGrammar):
+            message = 'Compiled table can not be updated.'
+            raise GramError(message)
+        changelog = self.grammar.changelog
+        changed = set(changelog[self.logindex:])
+        self.logindex = len(changelog)
+        if not changed: return
+        for key, closure in list(self.kernelcache.items()):
+            if self.is_affected(closure, changed):
+                del self.kernelcache[key]
+        self.conflicts = 0
+        self._fingerprint = None
+        self.actiondict = {}
+        self.gotodict = {}
+        self.reducedict = {}
+        self.termid = None
+        self.actionrows = None
+        self.actioncache = defaultdict(dict)
+        self.gotocache = defaultdict(dict)
+        self.closcache = defaultdict(int)
+        self.set_stats(self.stats)
+        self.build()
+
+    def compile(self):
+        # keep only what the parsers need, e.g.
+        # before the table is sent to workers
+        self.grammar = self.grammar.compile()
+        self.actioncache = defaultdict(dict)
+        self.gotocache = defaultdict(dict)
+        self.closcache = defaultdict(int)
+        self.kernelcache = {}
+        self.set_stats(None)
+        return self
+
+    def build_rows(self):
+        # the actions of each state as a list by
+        # the ids of the terms, for the columnar
+        # tokens, the last column is for unknown
+        terms = list(self.grammar.termdict) + ['$end']
+        self.termid = {t: i for i, t in enumerate(terms)}
+        rows = []
+        for i in range(len(self.actiondict)):
+            action = self.actiondict[i]
+            rows.append([action.get(t) for t in terms] + [None])
+        self.actionrows = rows
+        return rows
+
+    def set_default(self, i, actiondict):
+        # a state is consistent if its only action
+        # is reducing by one single production, so
+        # the parser can reduce without lookahead
+        actions = set(actiondict.values())
+        if len(actions) == 1:
+            next = actions.pop()
+            if isinstance(next, tuple): return
+            if next < 0: self.reducedict[i] = next
+
+    def set_action(self, actiondict, a, next):
+        # without keep_conflicts, the later
+        # action wins, just as it used to be
+        last = actiondict.get(a)
+        if last is None or not self.keep_conflicts:
+            actiondict[a] = next
+            return
+        # or keep all the actions of the cell
+        # in a tuple for the GLR parser to fork
+        if not isinstance(last, tuple): last = (last,)
+        if next not in last:
+            if len(last) == 1: self.conflicts += 1
+            actiondict[a] = last + (next,)
+
 
 class SLRTable(LRTable):
-    def __init__(self, grammar):
-        super().__init__(grammar)
-        self.slr_table()
+    kind = 'slr'
+
+    def __init__(self, grammar, keep_conflicts=False, stats=None):
+        super().__init__(grammar, keep_conflicts, stats)
+        self.build()
+
+    def build(self):
+        if self.stats is None:
+            self.slr_table()
+        else:
+            self.stats.timed('table', self.slr_table)
+
+    def is_affected(self, closure, changed):
+        # the closure only adds the prods of the
+        # symbols right after the dots
+        for c in closure:
+            if c.next_sym in changed: return True
+        return False
+
+    def raise_conflict(self, a):
+        # every entry has $end in its follow, which
+        # adds $end reduces to all the states using
+        # it, but the lookaheads of CLR are exact
+        if a == '$end' and len(self.grammar.entrydict) > 1:
+            message = 'Conflict on $end of the entries, use CLRTable.'
+            raise GramError(message)
+        message = 'Conflict reduce and %s.'
+        raise GramError(message % 'shift')
 
     def slr_closure(self, state):
-        self._add_count += 1
+        # count on the grammar, as the marks on
+        # the prods are shared by all its tables
+        self.grammar._add_count += 1
+        add_count = self.grammar._add_count
         # state_i means Ii
         # a set of lr items
         closure = state[:]
@@ -331,19 +860,17 @@ class SLRTable(LRTable):
             been_changed = False
             for c in closure:
                 for a in c.lr_after:
-                    if a._add_count != self._add_count:
+                    if a._add_count != add_count:
                         been_changed = True
                         closure.append(a.lr_next)
-                        a._add_count = self._add_count
+                        a._add_count = add_count
         return closure
 
     def slr_goto(self, state, x):
         # if there is goto cached, just return it
         goto = self.gotocache.get((id(state), x))
         if goto is not None: return goto
-        # s is {} if x not in gotocache
-        # do remember the default is {}
-        s, gs = self.gotocache[x], []
+        gs = []
         # we have the state
         # and all the lr_next
         for item in state:
@@ -352,22 +879,28 @@ class SLRTable(LRTable):
                 # x can be vn or vt
                 # and we got a goto
                 if n.lr_before == x:
-                    t = s.get(id(n))
-                    if t is None:
-                        s[id(n)] = {}
-                        t = s[id(n)]
-                    s = t
                     gs.append(n)
-        goto = s.get('$end')
-        if goto is None:
-            if gs: goto = self.slr_closure(gs)
-            s['$end'] = goto if gs else []
+        goto = self.slr_kernel(gs)
         self.gotocache[(id(state), x)] = goto
         return goto
 
+    def slr_kernel(self, gs):
+        # the same kernel gives the same state,
+        # and the items are shared, so use ids
+        key = tuple(id(n) for n in gs)
+        goto = self.kernelcache.get(key)
+        if goto is None:
+            goto = self.slr_closure(gs) if gs else []
+            self.kernelcache[key] = goto
+        return goto
+
     def slr_items(self):
-        states = [self.slr_closure([self.prodlist[0].lr_next])]
+        # one initial state for each entry
+        entries = self.grammar.entrydict.values()
+        states = [self.slr_kernel([p.lr_next]) for p in entries]
         for i, c in enumerate(states): self.closcache[id(c)] = i
+        entries = enumerate(self.grammar.entrydict)
+        self.startdict = {name: i for i, name in entries}
         index = 0  # must use while
         # traverse all unvisited states
         # and generate their goto states
@@ -398,28 +931,27 @@ class SLRTable(LRTable):
             for item in state:
                 if item.can_reduce:
                     if item.name == "S'":
-                        actiondict['$end'] = 0
+                        self.set_action(actiondict, '$end', 0)
                         actionprod['$end'] = item
                     else:
                         # the lookaheads of slr is the follow
                         for a in self.grammar.follow[item.name]:
                             if actiondict.get(a) is not None:
-                                message = 'Conflict reduce and %s.'
-                                raise GramError(message % 'shift')
+                                if not self.keep_conflicts:
+                                    self.raise_conflict(a)
                             # reverse index(-1, -2, ...)
-                            actiondict[a] = -item.index
+                            self.set_action(actiondict, a, -item.index)
                             actionprod[a] = item
                 else:
-                    index = item.lr_index
                     # e.g. S -> a.Sb, s = S
-                    s = item.syms[index + 1]
+                    s = item.next_sym
                     if s in self.grammar.termdict:
                         # now we have a shift item
                         goto = self.slr_goto(state, s)
                         # get the index of goto in all states
                         c = self.closcache.get(id(goto), -1)
                         if c >= 0:
-                            actiondict[s] = c
+                            self.set_action(actiondict, s, c)
                             actionprod[s] = item
             # already finished the action
             # now generate the goto table
@@ -437,12 +969,33 @@ class SLRTable(LRTable):
                     gotodict[n] = c
             self.actiondict[i] = actiondict
             self.gotodict[i] = gotodict
+            self.set_default(i, actiondict)
 
 
 class CLRTable(LRTable):
-    def __init__(self, grammar):
-        super().__init__(grammar)
-        self.clr_table()
+    kind = 'clr'
+
+    def __init__(self, grammar, keep_conflicts=False, stats=None,
+                 workers=1):
+        super().__init__(grammar, keep_conflicts, stats)
+        # the processes to build the states with,
+        # None for all the cores, 1 for no pool
+        self.workers = workers
+        self.build()
+
+    def build(self):
+        if self.stats is None:
+            self.clr_table()
+        else:
+            self.stats.timed('table', self.clr_table)
+
+    def is_affected(self, closure, changed):
+        # the lookaheads also depend on the first
+        # sets of all the symbols after the dots
+        for c in closure:
+            for s in c.prod.syms[c.lr_index:]:
+                if s in changed: return True
+        return False
 
     def clr_closure(self, state: Iterable[LRItem]):
         self._add_count += 1
@@ -454,8 +1007,8 @@ class CLRTable(LRTable):
                 for a in c.lr_after:
                     # copy it since there is no
                     # lookaheads in origin items
-                    item = deepcopy(a.lr_next)
-                    syms = list(c.syms[c.lr_index + 2:])
+                    item = a.lr_next.copy()
+                    syms = c.prod.syms[c.lr_index + 1:]
                     first = self.grammar.get_first(syms)
                     if '<empty>' in first:
                         first.remove('<empty>')
@@ -469,22 +1022,31 @@ class CLRTable(LRTable):
     def clr_goto(self, state, x):
         goto = self.gotocache.get((state, x))
         if goto is not None: return goto
-        s, gs = self.gotocache[x], []
-        for item in state:
-            n = item.lr_next
-            if n is not None:
-                if n.lr_before == x:
-                    n = deepcopy(n)
-                    n.lr_aheads = item.lr_aheads
-                    if n not in gs: gs.append(n)
-        goto = self.clr_closure(gs)
+        goto = self.clr_kernel(goto_kernel(state, x))
         self.gotocache[(state, x)] = goto
-        return tuple(goto) if goto else None
+        return goto if goto else None
+
+    def clr_kernel(self, gs):
+        # the items are copies with lookaheads,
+        # so the kernel is keyed by the hashes
+        key = tuple(gs)
+        goto = self.kernelcache.get(key)
+        if goto is None:
+            goto = self.clr_closure(gs)
+            self.kernelcache[key] = goto
+        return goto
 
     def clr_items(self):
-        item = self.prodlist[0].lr_next  # no lookaheads now
-        closure = [self.clr_closure([item.copy(['$end'])])]
+        # one initial state for each entry
+        entries = self.grammar.entrydict.values()
+        # no lookaheads in the items now
+        items = [p.lr_next.copy(['$end']) for p in entries]
+        closure = [self.clr_kernel([i]) for i in items]
         for i, c in enumerate(closure): self.closcache[c] = i
+        entries = enumerate(self.grammar.entrydict)
+        self.startdict = {name: i for i, name in entries}
+        if self.workers != 1:
+            return self.clr_items_pool(closure)
         index = 0  # must use while
         # traverse all unvisited states
         # and generate their goto states
@@ -501,6 +1063,66 @@ class CLRTable(LRTable):
         #     print('%d: %s' % (i, dumps_items(each)))
         return closure
 
+    def clr_items_pool(self, closure):
+        # the kernels of the gotos of the states
+        # found in the last round are made here,
+        # the workers build only the closures not
+        # in the kernelcache, which update() keeps
+        # if not affected, and then the states are
+        # numbered in the order of clr_items(), so
+        # the table is the same as the sequential
+        prodlist = self.grammar.prodlist
+        kernelcache = self.kernelcache
+        # the lookaheads back from the workers are
+        # other str objects, use the ones of here
+        aheads = {a: a for f in self.grammar.first.values() for a in f}
+        for c in closure:
+            for item in c: aheads.update((a, a) for a in item.lr_aheads)
+        workers = self.workers or os.cpu_count()
+        # made only when some closures are missing
+        pool = None
+        try:
+            index = 0
+            while index < len(closure):
+                found, index = closure[index:], len(closure)
+                # kernels[i] = [(<sym>, <kernel>)] of found[i]
+                kernels = []
+                # missing[<kernel>] = None, in order
+                missing = {}
+                for c in found:
+                    gotos = []
+                    for s in unique_symbols(c, reverse=False):
+                        kernel = tuple(goto_kernel(c, s))
+                        gotos.append((s, kernel))
+                        if kernel not in kernelcache:
+                            missing[kernel] = None
+                    kernels.append(gotos)
+                if missing:
+                    if pool is None:
+                        pool = ProcessPoolExecutor(
+                            workers, initializer=init_clr_worker,
+                            initargs=clr_skeleton(self.grammar))
+                    missing = list(missing)
+                    size = -(-len(missing) // (workers * 4))
+                    chunks = [[item_keys(k) for k in missing[i:i + size]]
+                              for i in range(0, len(missing), size)]
+                    results = pool.map(clr_closures, chunks)
+                    results = [keys for r in results for keys in r]
+                    for kernel, keys in zip(missing, results):
+                        kernelcache[kernel] = tuple(
+                            prodlist[i].lr_items[j].copy(
+                                [aheads[x] for x in a]) for i, j, a in keys)
+                for c, gotos in zip(found, kernels):
+                    for s, kernel in gotos:
+                        goto = kernelcache[kernel]
+                        self.gotocache[(c, s)] = goto
+                        if goto and goto not in self.closcache:
+                            self.closcache[goto] = len(closure)
+                            closure.append(goto)
+        finally:
+            if pool is not None: pool.shutdown()
+        return closure
+
     def clr_table(self):
         # do almost the same things slr_table() does
         # the differences: using hash instead of id
@@ -518,28 +1140,28 @@ class CLRTable(LRTable):
             for item in state:
                 if item.can_reduce:
                     if item.name == "S'":
-                        actiondict['$end'] = 0
+                        self.set_action(actiondict, '$end', 0)
                         actionprod['$end'] = item
                     else:
                         # the lookaheads of slr is the follow
                         for a in item.lr_aheads:
                             if actiondict.get(a) is not None:
-                                message = 'Conflict reduce and %s.'
-                                raise GramError(message % 'shift')
+                                if not self.keep_conflicts:
+                                    message = 'Conflict reduce and %s.'
+                                    raise GramError(message % 'shift')
                             # reverse index(-1, -2, ...)
-                            actiondict[a] = -item.index
+                            self.set_action(actiondict, a, -item.index)
                             actionprod[a] = item
                 else:
-                    index = item.lr_index
                     # e.g. S -> a.Sb, s = S
-                    s = item.syms[index + 1]
+                    s = item.next_sym
                     if s in self.grammar.termdict:
                         # now we have a shift item
                         goto = self.clr_goto(state, s)
                         # get the index of goto in all states
                         c = self.closcache.get(goto, -1)
                         if c >= 0:
-                            actiondict[s] = c
+                            self.set_action(actiondict, s, c)
                             actionprod[s] = item
             # already finished the action
             # now generate the goto table
@@ -557,6 +1179,73 @@ class CLRTable(LRTable):
                     gotodict[n] = c
             self.actiondict[i] = actiondict
             self.gotodict[i] = gotodict
+            self.set_default(i, actiondict)
+
+
+def item_keys(items: Iterable[LRItem]):
+    # the items as (prod index, lr_index, aheads)
+    # to be sent to and back from the workers
+    return tuple((i.prod.index, i.lr_index, tuple(i.lr_aheads))
+                 for i in items)
+
+
+def clr_skeleton(grammar: Grammar):
+    # what the workers need to build the states,
+    # but not the funcs, which may not pickle,
+    # nor the items, which are too deep to
+    prods = [(p.name, p.syms) for p in grammar.prodlist]
+    return list(grammar.termdict), prods, dict(grammar.first)
+
+
+# the table of the worker process
+clr_worker = None
+
+
+def init_clr_worker(terms, prods, first):
+    global clr_worker
+    grammar = Grammar(terms)
+    for name, syms in prods[1:]:
+        if name == "S'":
+            # the entries are not in proddict
+            i = len(grammar.prodlist)
+            grammar.prodlist.append(Production(i, name, syms))
+        else:
+            grammar.add_prod(name, syms)
+    grammar.prodlist[0] = Production(0, *prods[0])
+    # the same first sets give the same order
+    # of the lookaheads as in the main process
+    grammar.first.update(first)
+    grammar.build_lr_items()
+    clr_worker = CLRTable.__new__(CLRTable)
+    LRTable.__init__(clr_worker, grammar)
+
+
+def goto_kernel(state, x):
+    # the items of state after x, as the kernel
+    # of the goto, with the same lookaheads
+    gs = []
+    for item in state:
+        n = item.lr_next
+        if n is not None:
+            if n.lr_before == x:
+                n = n.copy()
+                n.lr_aheads = item.lr_aheads
+                if n not in gs: gs.append(n)
+    return gs
+
+
+def clr_closures(kernels):
+    # the keys of the closure of each kernel
+    prodlist = clr_worker.grammar.prodlist
+    result = []
+    for keys in kernels:
+        kernel = [prodlist[i].lr_items[j].copy(list(a))
+                  for i, j, a in keys]
+        result.append(item_keys(clr_worker.clr_closure(kernel)))
+    return result
+
+
+ATOMIC_TYPES = (type(None), bool, int, float, complex, str, bytes)
 
 
 class LRToken:
@@ -569,7 +1258,12 @@ class LRToken:
         return '{}({})'.format(*args)
 
     def copy(self, name=None):
-        item = deepcopy(self)
+        if type(self) is LRToken and type(self.value) in ATOMIC_TYPES:
+            # deepcopy gives the same value
+            # of atomic types, so skip it
+            item = LRToken(self.name, self.value)
+        else:
+            item = deepcopy(self)
         if name is not None:
             # keep the lr_aheads when
             # the given name is None
@@ -577,11 +1271,389 @@ class LRToken:
         return item
 
 
+class TokenColumns:
+    # the tokens as columns, kinds[i] is the index
+    # of the name of token i in names, e.g. in an
+    # array('H') or a numpy array, the values and
+    # positions are optional parallel sequences,
+    # and the $end is implied after the last one
+    def __init__(self, names, kinds, values=None, positions=None):
+        self.names = list(names)
+        self.kinds = kinds
+        self.values = values
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.kinds) + 1
+
+    def __getitem__(self, i):
+        # the token is made only when asked for
+        if i == len(self.kinds): return LRToken('$end')
+        value = None if self.values is None else self.values[i]
+        return LRToken(self.names[self.kinds[i]], value)
+
+    def position(self, i):
+        if self.positions is None or i >= len(self.positions):
+            return i
+        return self.positions[i]
+
+    @classmethod
+    def from_tokens(cls, tokens, typecode='H'):
+        # intern the names, and drop the $end
+        namedict = {}
+        kinds = array(typecode)
+        values = []
+        for t in tokens:
+            if t.name == '$end': break
+            kinds.append(namedict.setdefault(t.name, len(namedict)))
+            values.append(t.value)
+        return cls(namedict, kinds, values)
+
+
+class LRTree:
+    def __init__(self, prodlist, tokens):
+        self.prodlist = prodlist
+        self.tokens = tokens
+        # one column per field of the nodes, nodes
+        # are numbered after their kids, the root
+        # at last, and the kind is the prod index
+        # or 0 for the tokens
+        self.kind = array('i')
+        self.parent = array('i')
+        self.child = array('i')
+        self.sibling = array('i')
+        # the span of tokens [start, end)
+        self.start = array('i')
+        self.end = array('i')
+
+    def __len__(self):
+        return len(self.kind)
+
+    def __getitem__(self, i):
+        return LRNode(self, i)
+
+    @property
+    def root(self):
+        return LRNode(self, len(self) - 1)
+
+    def add_leaf(self, index):
+        i = len(self.kind)
+        self.kind.append(0)
+        self.parent.append(-1)
+        self.child.append(-1)
+        self.sibling.append(-1)
+        self.start.append(index)
+        self.end.append(index + 1)
+        return i
+
+    def add_node(self, p: Production, kids, index):
+        # index is the position of the next
+        # token, which is the span of empty
+        i = len(self.kind)
+        self.kind.append(p.index)
+        self.parent.append(-1)
+        self.sibling.append(-1)
+        if kids:
+            self.child.append(kids[0])
+            self.start.append(self.start[kids[0]])
+            self.end.append(self.end[kids[-1]])
+            for a, b in zip(kids, kids[1:]):
+                self.sibling[a] = b
+            for k in kids:
+                self.parent[k] = i
+        else:
+            self.child.append(-1)
+            self.start.append(index)
+            self.end.append(index)
+        return i
+
+    def add_chain(self, nodestack, p: Production):
+        # name -> name op operand, but group the
+        # ops by their precedence, the same as
+        # chain_symbols() does on the values
+        self.finish_chains(nodestack, 1)
+        left, op, right = nodestack[-3:]
+        del nodestack[-3:]
+        if type(left) is NodeChain:
+            chain = left
+        else:
+            chain = NodeChain(left)
+        level, right_assoc = p.prec
+        operators = chain.operators
+        while operators:
+            last = self.prodlist[operators[-1][0]].prec[0]
+            if last < level or last == level and right_assoc: break
+            self.apply_chain(chain)
+        operators.append((p.index, op))
+        chain.operands.append(right)
+        nodestack.append(chain)
+
+    def apply_chain(self, chain):
+        index, op = chain.operators.pop()
+        right = chain.operands.pop()
+        left = chain.operands.pop()
+        node = self.add_node(self.prodlist[index], [left, op, right], 0)
+        chain.operands.append(node)
+
+    def finish_chains(self, nodestack, n):
+        # finish the chains in the last n nodes
+        for i in range(len(nodestack) - n, len(nodestack)):
+            chain = nodestack[i]
+            if type(chain) is NodeChain:
+                while chain.operators: self.apply_chain(chain)
+                nodestack[i] = chain.operands[0]
+
+    def children(self, i):
+        c = self.child[i]
+        while c >= 0:
+            yield c
+            c = self.sibling[c]
+
+    def preorder(self, i=None):
+        if i is None: i = len(self) - 1
+        todo = [i]
+        while todo:
+            i = todo.pop()
+            yield i
+            kids = list(self.children(i))
+            todo.extend(reversed(kids))
+
+
+class NodeChain:
+    # the unfinished chain of an expression in
+    # LRTree, the nodes of ExprToken
+    def __init__(self, first):
+        self.operands = [first]
+        # (<prod index>, <op node>)
+        self.operators = []
+
+
+class LRNode:
+    # a view of a node in LRTree, which
+    # is created only when it is needed
+    def __init__(self, tree: LRTree, i):
+        self.tree = tree
+        self.i = i
+
+    def __str__(self):
+        if self.is_token: return str(self.token)
+        return str(self.prod)
+
+    def __eq__(self, node):
+        if not isinstance(node, LRNode): return False
+        return self.tree is node.tree and self.i == node.i
+
+    def __hash__(self):
+        return hash((id(self.tree), self.i))
+
+    @property
+    def is_token(self):
+        return self.tree.kind[self.i] == 0
+
+    @property
+    def prod(self):
+        if self.is_token: return None
+        return self.tree.prodlist[self.tree.kind[self.i]]
+
+    @property
+    def token(self):
+        if not self.is_token: return None
+        return self.tree.tokens[self.tree.start[self.i]]
+
+    @property
+    def name(self):
+        if self.is_token: return self.token.name
+        return self.prod.name
+
+    @property
+    def value(self):
+        if self.is_token: return self.token.value
+        return None
+
+    @property
+    def span(self):
+        return self.tree.start[self.i], self.tree.end[self.i]
+
+    @property
+    def parent(self):
+        i = self.tree.parent[self.i]
+        if i < 0: return None
+        return LRNode(self.tree, i)
+
+    @property
+    def children(self):
+        tree = self.tree
+        return [LRNode(tree, c) for c in tree.children(self.i)]
+
+
+def empty_func(sym, args, stack):
+    return None
+
+
+def prod_func(p: Production, funcs=None):
+    # the func of p, or the one in funcs, which
+    # maps prod index to func, as in replay()
+    if funcs is None: return p.f
+    return funcs.get(p.index) or empty_func
+
+
+class ExprToken(LRToken):
+    # the unfinished chain of an expression, the
+    # ops wait here for the ones binding tighter,
+    # only the prod indexes are kept, so that it
+    # can be pickled in the snapshots
+    def __init__(self, name, first):
+        super().__init__(name)
+        self.operands = [first]
+        # (<prod index>, <op token>)
+        self.operators = []
+
+    def apply(self, stack, prodlist, funcs=None):
+        # apply the last op to its two operands
+        index, op = self.operators.pop()
+        p = prodlist[index]
+        right = self.operands.pop()
+        left = self.operands.pop()
+        symbol = right.copy(p.name)
+        prod_func(p, funcs)(symbol, [left, op, right], stack)
+        self.operands.append(symbol)
+
+    def finish(self, stack, prodlist, funcs=None):
+        while self.operators: self.apply(stack, prodlist, funcs)
+        return self.operands[0]
+
+
+def chain_symbols(symbolstack, p: Production, prodlist, funcs=None):
+    # reduce name -> name op operand, but apply
+    # the ops on the chain by their precedence
+    # the operand may be the chain of another
+    # expression nonterm, which is done here
+    finish_symbols(symbolstack, 1, prodlist, funcs)
+    left, op, right = symbolstack[-3:]
+    del symbolstack[-3:]
+    if type(left) is ExprToken:
+        chain = left
+    else:
+        chain = ExprToken(p.name, left)
+    level, right_assoc = p.prec
+    operators = chain.operators
+    while operators:
+        last = prodlist[operators[-1][0]].prec[0]
+        if last < level or last == level and right_assoc: break
+        chain.apply(symbolstack, prodlist, funcs)
+    operators.append((p.index, op))
+    chain.operands.append(right)
+    symbolstack.append(chain)
+
+
+def finish_symbols(symbolstack, n, prodlist, funcs=None):
+    # finish the chains in the last n symbols,
+    # once they are used by the other prods
+    for i in range(len(symbolstack) - n, len(symbolstack)):
+        symbol = symbolstack[i]
+        if type(symbol) is ExprToken:
+            stack = symbolstack[:i]
+            symbolstack[i] = symbol.finish(stack, prodlist, funcs)
+
+
+def reduce_symbols(symbolstack, p: Production, prodlist, funcs=None):
+    # the same as the reduce of LRParser, but
+    # without states, and funcs replace p.f
+    if p.prec is not None:
+        chain_symbols(symbolstack, p, prodlist, funcs)
+        return
+    finish_symbols(symbolstack, len(p), prodlist, funcs)
+    func = prod_func(p, funcs)
+    symbol = symbolstack[-1].copy(p.name)
+    if len(p):
+        args = symbolstack[-len(p):]
+        del symbolstack[-len(p):]
+        func(symbol, args, symbolstack)
+    else:
+        func(symbol, None, symbolstack)
+    symbolstack.append(symbol)
+
+
+class ParseStats:
+    # what the parsers do, subclass it and override
+    # the methods to export them somewhere else
+    def __init__(self):
+        # shiftdict[<state>] = <count>, the LL
+        # parser counts the matched terms here
+        self.shiftdict = defaultdict(int)
+        self.gotodict = defaultdict(int)
+        # reducedict[<prod index>] = <count>
+        self.reducedict = defaultdict(int)
+        # statedict[<state>] = <reduce count>
+        self.statedict = defaultdict(int)
+        # timedict[<prod index>] = <seconds>
+        self.timedict = defaultdict(float)
+        self.max_depth = 0
+
+    def shift(self, state, depth):
+        self.shiftdict[state] += 1
+        if depth > self.max_depth: self.max_depth = depth
+
+    def goto(self, state, depth):
+        self.gotodict[state] += 1
+        if depth > self.max_depth: self.max_depth = depth
+
+    def reduce(self, p: Production, state, seconds):
+        # seconds of the action and the reduction
+        self.reducedict[p.index] += 1
+        self.statedict[state] += 1
+        self.timedict[p.index] += seconds
+
+
+class TracedStack(list):
+    # the state stack telling the stats of every
+    # push, only used when the stats are set, so
+    # the plain list costs nothing more
+    def __init__(self, stats: ParseStats, states=()):
+        super().__init__(states)
+        self.stats = stats
+        self.reducing = False
+
+    def append(self, state):
+        list.append(self, state)
+        if self.reducing:
+            self.stats.goto(state, len(self))
+        else:
+            self.stats.shift(state, len(self))
+
+
 class LRParser:
-    def __init__(self, table: LRTable):
+    def __init__(self, table: LRTable, logging=False):
+        if table.conflicts:
+            message = 'Conflicts in table, use GLRParser.'
+            raise GramError(message)
         self.table = table
         self.statestack = None
         self.symbolstack = None
+        # the number of shifted tokens
+        self.position = 0
+        # reducelog records the index of shifted
+        # tokens and the -index of reduced prods
+        self.logging = logging
+        self.reducelog = None
+        # streamdict[<name>] = <callback>
+        self.streamdict = {}
+        self.accepted = False
+        # collect the errors instead of raising
+        self.recovery = False
+        self.syncset = set()
+        self.errors = []
+        # no error reported while it is quiet
+        self.quiet = 0
+        # whether there are expression chains
+        self.chained = False
+        # cache[<key>] = <value>, in LRU order
+        self.cache = None
+        self.cachesize = 0
+        self.hits = 0
+        self.misses = 0
+        # see set_stats()
+        self.stats = None
 
     @property
     def prodlist(self):
@@ -595,54 +1667,555 @@ class LRParser:
     def gotodict(self):
         return self.table.gotodict
 
-    def restart(self):
+    @property
+    def reducedict(self):
+        return self.table.reducedict
+
+    def restart(self, start=None):
+        # start with the given entry of the
+        # grammar, or the start symbol
         sym = LRToken('$end')
-        self.statestack = [0]
+        state = 0
+        if start is not None:
+            state = self.table.startdict[start]
+        self.statestack = [state]
+        if self.stats is not None:
+            self.statestack = TracedStack(self.stats, self.statestack)
         self.symbolstack = [sym]
+        self.position = 0
+        self.accepted = False
+        self.errors = []
+        self.quiet = 0
+        self.chained = bool(self.table.grammar.exprdict)
+        if self.logging:
+            self.reducelog = array('l')
+
+    def reduce(self, p: Production):
+        statestack = self.statestack
+        symbolstack = self.symbolstack
+        if self.reducelog is not None:
+            self.reducelog.append(-p.index)
+        if self.chained:
+            if p.prec is not None:
+                # the op waits on the chain, and the
+                # goto of name is the state under op
+                chain_symbols(symbolstack, p, self.prodlist)
+                del statestack[-2:]
+                return
+            finish_symbols(symbolstack, len(p), self.prodlist)
+        symbol = symbolstack[-1].copy(p.name)
+        if len(p):
+            args = symbolstack[-len(p):]
+            # doing reduce from now
+            del symbolstack[-len(p):]
+            del statestack[-len(p):]
+            # doing actions while reducing
+            p.f(symbol, args, symbolstack)
+        else:
+            # doing actions while reducing
+            p.f(symbol, None, symbolstack)
+        streamdict = self.streamdict
+        if streamdict and p.name in streamdict:
+            # hand the symbol over to the callback
+            # and keep only its name on the stack
+            streamdict[p.name](symbol)
+            symbol = LRToken(p.name)
+        symbolstack.append(symbol)
+        # after applying the rule
+        # generate the next state
+        r_state = statestack[-1]
+        r_goto = self.gotodict[r_state]
+        next_state = r_goto[p.name]
+        statestack.append(next_state)
+
+    def parse(self, tokens, start=None):
+        if isinstance(tokens, TokenColumns):
+            return self.parse_columns(tokens, start)
+        key = None
+        if self.cache is not None:
+            key = self.cache_key(tokens, start)
+        if key is not None:
+            try:
+                value = self.cache.get(key, self.cache)
+            except TypeError:
+                # some values are not hashable
+                value, key = self.cache, None
+            if value is not self.cache:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                self.restart(start)
+                self.accepted = True
+                self.position = len(tokens) - 1
+                return value
+            elif key is not None:
+                self.misses += 1
+        value = self.parse_tokens(tokens, start)
+        if key is not None:
+            self.cache[key] = value
+            if len(self.cache) > self.cachesize:
+                self.cache.popitem(last=False)
+        return value
+
+    def set_stats(self, stats: ParseStats = None):
+        # count the steps of parse() and push() into
+        # the stats and time the reductions, and the
+        # parser is untouched when stats is None
+        self.stats = stats
+        if stats is None:
+            self.__dict__.pop('reduce', None)
+        else:
+            self.reduce = self.traced_reduce
+        if self.statestack is not None:
+            # set in the middle of a parse
+            states = list(self.statestack)
+            if stats is not None:
+                states = TracedStack(stats, states)
+            self.statestack = states
+        return stats
+
+    def traced_reduce(self, p: Production):
+        statestack = self.statestack
+        state = statestack[-1]
+        statestack.reducing = True
+        begin = perf_counter()
+        try:
+            type(self).reduce(self, p)
+        finally:
+            statestack.reducing = False
+        self.stats.reduce(p, state, perf_counter() - begin)
+
+    def set_cache(self, size=128):
+        # parse() returns the value of the same
+        # tokens from the cache, so the actions
+        # must be pure, and size 0 turns it off
+        self.cache = OrderedDict() if size > 0 else None
+        self.cachesize = size
+        self.hits = 0
+        self.misses = 0
+
+    def cache_key(self, tokens, start):
+        # None if the parse can not be cached, as
+        # the log, the errors and the streamed
+        # symbols are not stored
+        if self.logging or self.recovery: return None
+        if self.streamdict: return None
+        syms = tuple((t.name, t.value) for t in tokens)
+        return self.table.fingerprint, start, syms
+
+    def parse_tokens(self, tokens, start=None):
+        self.restart(start)
+        # popped from the left in O(1)
+        tokens = deque(tokens)
+        # reassign for convenience
+        prodlist = self.prodlist
+        actiondict = self.actiondict
+        reducedict = self.reducedict
+        statestack = self.statestack
+        symbolstack = self.symbolstack
+        reducelog = self.reducelog
+        while True:
+            state = statestack[-1]
+            # consistent states reduce by default
+            # without consulting the lookahead
+            next = reducedict.get(state)
+            if next is None:
+                next_sym = tokens[0]
+                action = actiondict[state]
+                next = action.get(next_sym.name)
+            if next is not None:
+                if next > 0:
+                    statestack.append(next)
+                    next_sym = tokens.popleft()
+                    symbolstack.append(next_sym)
+                    if reducelog is not None:
+                        reducelog.append(self.position)
+                    self.position += 1
+                    if self.quiet: self.quiet -= 1
+                elif next < 0:
+                    self.reduce(prodlist[-next])
+                # for readability
+                elif next == 0:
+                    self.accepted = True
+                    finish_symbols(symbolstack, 1, prodlist)
+                    symbol = symbolstack[-1]
+                    return symbol.value
+            else:
+                if self.recovery and self.recover(tokens):
+                    continue
+                message = 'Parsing error.'
+                raise GramError(message)
 
-    def parse(self, tokens):
-        self.restart()
+    def parse_columns(self, columns: TokenColumns, start=None):
+        # read the kinds by index, and the actions
+        # by the ids of the kinds instead of names,
+        # the stack keeps the indexes of the tokens
+        # until the func of a prod takes them, and
+        # the recovery still works on the tokens
+        if self.recovery:
+            return self.parse_tokens(list(columns), start)
+        self.restart(start)
+        table = self.table
+        rows = table.actionrows
+        if rows is None: rows = table.build_rows()
+        termid = table.termid
+        # ids[<kind>] = <column>
+        ids = [termid.get(n, len(termid)) for n in columns.names]
+        kinds = columns.kinds
+        if not isinstance(kinds, (array, list)):
+            # e.g. numpy, whose items are slow
+            kinds = kinds.tolist()
+        # the columns of the tokens and the $end
+        cols = [ids[k] for k in kinds]
+        cols.append(termid['$end'])
+        names = columns.names
+        values = columns.values
+        # renamed[<index>] = <nonterm>, for the ones
+        # reduced by the prods without any func
+        renamed = {}
+
+        def make(i):
+            value = None if values is None else values[i]
+            return LRToken(renamed.pop(i, None) or names[kinds[i]], value)
+
+        # the default reduce only renames the index,
+        # unless the reduce does more than the func
+        plain = not (self.chained or self.streamdict or self.stats)
         # reassign for convenience
         prodlist = self.prodlist
+        reducedict = self.reducedict
+        gotodict = self.gotodict
+        statestack = self.statestack
+        symbolstack = self.symbolstack
+        reducelog = self.reducelog
+        index = 0
+        while True:
+            state = statestack[-1]
+            next = reducedict.get(state)
+            if next is None:
+                next = rows[state][cols[index]]
+            if next is not None:
+                if next > 0:
+                    statestack.append(next)
+                    symbolstack.append(index)
+                    if reducelog is not None:
+                        reducelog.append(index)
+                    index += 1
+                    self.position = index
+                elif next < 0:
+                    p = prodlist[-next]
+                    n = len(p)
+                    if plain and n:
+                        # the reduce() without the chains and
+                        # the streams, on the indexes
+                        top = symbolstack[-1]
+                        if p.func is None and type(top) is int:
+                            # the symbol is a copy of the last one
+                            renamed[top] = p.name
+                            del symbolstack[-n:-1]
+                        else:
+                            args = [make(a) if type(a) is int else a
+                                    for a in symbolstack[-n:]]
+                            symbol = args[-1].copy(p.name)
+                            del symbolstack[-n:]
+                            p.f(symbol, args, symbolstack)
+                            symbolstack.append(symbol)
+                        if reducelog is not None:
+                            reducelog.append(-p.index)
+                        del statestack[-n:]
+                        statestack.append(gotodict[statestack[-1]][p.name])
+                        continue
+                    for i in range(-(n or 1), 0):
+                        if type(symbolstack[i]) is int:
+                            symbolstack[i] = make(symbolstack[i])
+                    self.reduce(p)
+                elif next == 0:
+                    self.accepted = True
+                    if type(symbolstack[-1]) is int:
+                        symbolstack[-1] = make(symbolstack[-1])
+                    finish_symbols(symbolstack, 1, prodlist)
+                    symbol = symbolstack[-1]
+                    return symbol.value
+            else:
+                for i, symbol in enumerate(symbolstack):
+                    if type(symbol) is int: symbolstack[i] = make(symbol)
+                expected = sorted(self.actiondict[state])
+                position = columns.position(index)
+                raise ParsingError(position, columns[index], expected)
+
+    def set_recovery(self, sync=None):
+        # parse() goes on after errors with the
+        # error productions or the sync terms,
+        # and collects all errors in self.errors
+        if sync is None:
+            sync = self.table.grammar.syncset
+        self.recovery = True
+        self.syncset = set(sync)
+
+    def recover(self, tokens):
+        # return False if it can not recover
         actiondict = self.actiondict
+        statestack = self.statestack
+        token = tokens[0]
+        if not self.quiet:
+            expected = sorted(actiondict[statestack[-1]])
+            error = ParsingError(self.position, token, expected)
+            self.errors.append(error)
+        elif self.quiet == 3:
+            # nothing shifted since the last error,
+            # so just discard the token this time
+            if token.name == '$end': return False
+            self.discard(tokens)
+            return True
+        self.quiet = 3
+        # the log can not record popped symbols
+        self.reducelog = None
+        if 'error' in self.table.grammar.termdict:
+            if self.recover_error(tokens): return True
+        return self.recover_panic(tokens)
+
+    def discard(self, tokens):
+        tokens.popleft()
+        self.position += 1
+
+    def recover_error(self, tokens):
+        # pop the stack until a state shifts the
+        # error term, just as what yacc does
+        actiondict = self.actiondict
+        statestack = self.statestack
+        symbolstack = self.symbolstack
+        for depth in range(len(statestack) - 1, -1, -1):
+            next = actiondict[statestack[depth]].get('error')
+            if next is not None and next > 0: break
+        else:
+            return False
+        del statestack[depth + 1:]
+        del symbolstack[depth + 1:]
+        statestack.append(next)
+        symbolstack.append(LRToken('error', tokens[0]))
+        # then discard tokens until one of them
+        # can be shifted after the error term
+        while not self.viable(depth + 1, tokens[0].name):
+            if tokens[0].name == '$end': return False
+            self.discard(tokens)
+        return True
+
+    def recover_panic(self, tokens):
+        # discard tokens until a sync term or the
+        # one after it, and pop the stack until a
+        # state has action on the token
+        statestack = self.statestack
+        symbolstack = self.symbolstack
+        syncset = self.syncset
+        after_sync = not syncset
+        while True:
+            name = tokens[0].name
+            if after_sync or name in syncset or name == '$end':
+                for depth in range(len(statestack) - 1, -1, -1):
+                    if self.viable(depth, name):
+                        del statestack[depth + 1:]
+                        del symbolstack[depth + 1:]
+                        return True
+            if name == '$end': return False
+            after_sync = not syncset or name in syncset
+            self.discard(tokens)
+
+    def viable(self, depth, name):
+        # whether the term is shifted or accepted
+        # on the stack cut at depth, after all its
+        # reductions, as the SLR tables may reduce
+        # on a term that can not follow at last
+        prodlist = self.prodlist
+        actiondict = self.actiondict
+        reducedict = self.reducedict
         gotodict = self.gotodict
+        states = self.statestack[:depth + 1]
+        while True:
+            state = states[-1]
+            next = reducedict.get(state)
+            if next is None:
+                next = actiondict[state].get(name)
+            if next is None: return False
+            if next >= 0: return True
+            p = prodlist[-next]
+            if len(p): del states[-len(p):]
+            states.append(gotodict[states[-1]][p.name])
+
+    def push(self, token):
+        # feed the parser one token at a time, the
+        # value is returned once $end is accepted,
+        # and the next token starts a new parse
+        if self.statestack is None or self.accepted:
+            self.restart()
+        prodlist = self.prodlist
+        actiondict = self.actiondict
+        reducedict = self.reducedict
         statestack = self.statestack
         symbolstack = self.symbolstack
         while True:
-            next_sym = tokens[0]
             state = statestack[-1]
-            symbol = symbolstack[-1]
-            action = actiondict[state]
-            next = action.get(next_sym.name)
+            next = reducedict.get(state)
+            if next is None:
+                action = actiondict[state]
+                next = action.get(token.name)
+            if next is None:
+                message = 'Parsing error.'
+                raise GramError(message)
+            if next > 0:
+                statestack.append(next)
+                symbolstack.append(token)
+                if self.reducelog is not None:
+                    self.reducelog.append(self.position)
+                self.position += 1
+                break
+            elif next < 0:
+                self.reduce(prodlist[-next])
+            elif next == 0:
+                self.accepted = True
+                finish_symbols(symbolstack, 1, prodlist)
+                symbol = symbolstack[-1]
+                return symbol.value
+        # reduce the consistent states right now
+        # instead of waiting for the next token
+        next = reducedict.get(statestack[-1])
+        while next is not None:
+            self.reduce(prodlist[-next])
+            next = reducedict.get(statestack[-1])
+        return None
+
+    def snapshot(self):
+        # dump the parse in progress, then resume()
+        # it and push() tokens from self.position
+        state = (self.table.fingerprint,
+                 array('l', self.statestack),
+                 self.symbolstack,
+                 self.position,
+                 self.reducelog)
+        return zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+
+    def resume(self, blob):
+        state = pickle.loads(zlib.decompress(blob))
+        fingerprint, statestack, symbolstack, position, reducelog = state
+        if fingerprint != self.table.fingerprint:
+            message = 'Snapshot of another table.'
+            raise GramError(message)
+        self.statestack = list(statestack)
+        if self.stats is not None:
+            self.statestack = TracedStack(self.stats, self.statestack)
+        self.symbolstack = symbolstack
+        self.position = position
+        self.reducelog = reducelog
+        self.accepted = False
+        self.chained = bool(self.table.grammar.exprdict)
+
+    def stream(self, name, callback=None):
+        # reductions of the streamable nonterm
+        # are passed to callback and dropped
+        if callback is None:
+            self.streamdict.pop(name, None)
+        else:
+            self.streamdict[name] = callback
+
+    def parse_stream(self, tokens, names, start=None):
+        # a generator, tokens can be any iterable,
+        # yield the symbols of names when reduced,
+        # and return the value when it accepts
+        symbols = []
+        streamdict = self.streamdict
+        self.streamdict = dict(streamdict)
+        for name in names:
+            self.streamdict[name] = symbols.append
+        try:
+            self.restart(start)
+            for token in tokens:
+                value = self.push(token)
+                yield from symbols
+                symbols.clear()
+                if self.accepted: return value
+        finally:
+            self.streamdict = streamdict
+        message = 'Parsing error, perhaps %s.'
+        more_hint = 'missing the end symbol'
+        raise GramError(message % more_hint)
+
+    def parse_tree(self, tokens, start=None):
+        # parse without any semantic action, and
+        # record the tree into columnar arrays,
+        # the tokens are read but never popped
+        self.restart(start)
+        tree = LRTree(self.prodlist, tokens)
+        chained = self.chained
+        # reassign for convenience
+        prodlist = self.prodlist
+        actiondict = self.actiondict
+        reducedict = self.reducedict
+        gotodict = self.gotodict
+        statestack = self.statestack
+        nodestack = []
+        index = 0
+        while True:
+            state = statestack[-1]
+            next = reducedict.get(state)
+            if next is None:
+                next_sym = tokens[index]
+                action = actiondict[state]
+                next = action.get(next_sym.name)
             if next is not None:
                 if next > 0:
                     statestack.append(next)
-                    next_sym = tokens.pop(0)
-                    symbolstack.append(next_sym)
+                    nodestack.append(tree.add_leaf(index))
+                    index += 1
                 elif next < 0:
                     p = prodlist[-next]
-                    symbol = symbol.copy(p.name)
+                    if chained and p.prec is not None:
+                        # the op waits on the chain,
+                        # just as reduce() does
+                        tree.add_chain(nodestack, p)
+                        del statestack[-2:]
+                        continue
+                    if chained:
+                        tree.finish_chains(nodestack, len(p))
+                    kids = ()
                     if len(p):
-                        args = symbolstack[-len(p):]
-                        # doing reduce from now
-                        del symbolstack[-len(p):]
+                        kids = nodestack[-len(p):]
+                        del nodestack[-len(p):]
                         del statestack[-len(p):]
-                        # doing actions while reducing
-                        p.f(symbol, args, symbolstack)
-                    else:
-                        # doing actions while reducing
-                        p.f(symbol, None, symbolstack)
-                    symbolstack.append(symbol)
-                    # after applying the rule
-                    # generate the next state
-                    r_state = statestack[-1]
-                    r_goto = gotodict[r_state]
-                    next_state = r_goto[p.name]
-                    statestack.append(next_state)
-                # for readability
+                    nodestack.append(tree.add_node(p, kids, index))
+                    r_goto = gotodict[statestack[-1]]
+                    statestack.append(r_goto[p.name])
                 elif next == 0:
-                    symbol = symbolstack[-1]
-                    return symbol.value
+                    if chained:
+                        tree.finish_chains(nodestack, 1)
+                    self.position = index
+                    return tree
             else:
                 message = 'Parsing error.'
                 raise GramError(message)
+
+    def replay(self, tokens, funcsets, reducelog=None):
+        # replay the log of a finished parse with
+        # every set of actions in one pass, sets
+        # map prod index to func, and the tokens
+        # are the ones given to parse() or push()
+        if reducelog is None:
+            reducelog = self.reducelog
+        if reducelog is None:
+            # never logged, or dropped by recover()
+            if self.logging and self.errors:
+                message = 'No reduction log after error recovery.'
+            else:
+                message = 'No reduction log, use logging=True.'
+            raise GramError(message)
+        prodlist = self.prodlist
+        stacks = [[LRToken('$end')] for _ in funcsets]
+        for next in reducelog:
+            if next >= 0:
+                token = tokens[next]
+                for symbolstack in stacks:
+                    symbolstack.append(token)
+            else:
+                p = prodlist[-next]
+                for i, funcs in enumerate(funcsets):
+                    reduce_symbols(stacks[i], p, prodlist, funcs)
+        for symbolstack, funcs in zip(stacks, funcsets):
+            finish_symbols(symbolstack, 1, prodlist, funcs)
+        return [s[-1].value for s in stacks]
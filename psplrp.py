@@ -0,0 +1,154 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from pslrp import GramError, LRParser, LRTable, LRToken
+
+# the table shared by the worker processes
+worker_table = None
+
+
+def init_worker(table: LRTable):
+    global worker_table
+    worker_table = table
+
+
+def parse_chunk(tokens, lookahead, listname, seed, first):
+    # run in the worker with the shared table
+    parser = LRParser(worker_table)
+    return run_chunk(parser, tokens, lookahead, listname, seed, first)
+
+
+def run_chunk(parser: LRParser, tokens, lookahead, listname, seed, first):
+    # parse the items of the list nonterm, and
+    # stop once it is the only one on the stack
+    parser.restart()
+    prodlist = parser.prodlist
+    actiondict = parser.actiondict
+    reducedict = parser.reducedict
+    statestack = parser.statestack
+    symbolstack = parser.symbolstack
+    list_state = parser.gotodict[0][listname]
+    if not first:
+        # the items after the first chunk start
+        # from the list with the seed value
+        statestack.append(list_state)
+        symbolstack.append(LRToken(listname, seed))
+    tokens = list(tokens) + [lookahead]
+    index = 0
+    while True:
+        if index == len(tokens) - 1 and statestack == [0, list_state]:
+            symbol = symbolstack[-1]
+            return symbol.value
+        state = statestack[-1]
+        next = reducedict.get(state)
+        if next is None:
+            next_sym = tokens[index]
+            action = actiondict[state]
+            next = action.get(next_sym.name)
+        if next is None or next == 0:
+            message = 'Parsing error.'
+            raise GramError(message)
+        if next > 0:
+            # never shift the lookahead, which
+            # belongs to the next chunk
+            if index == len(tokens) - 1:
+                message = 'Parsing error.'
+                raise GramError(message)
+            statestack.append(next)
+            symbolstack.append(tokens[index])
+            index += 1
+        else:
+            parser.reduce(prodlist[-next])
+
+
+class ParallelLRParser:
+    # parse the items of the top-level list in
+    # chunks split at the sync terms, in worker
+    # processes, and merge(left, right) values
+    # of the list nonterm from left to right
+    def __init__(self, table: LRTable, listname, merge, seed=None,
+                 workers=None, chunks=None):
+        self.table = table
+        self.listname = listname
+        self.merge = merge
+        self.seed = seed
+        self.workers = workers
+        self.chunks = chunks
+        self.executor = None
+
+    @property
+    def syncset(self):
+        return self.table.grammar.syncset
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def split(self, tokens):
+        # split right after the sync terms into
+        # chunks of nearly the same size, $end
+        # is the last token and never included
+        # all the cores are used if workers is None
+        workers = self.workers or os.cpu_count() or 1
+        chunks = self.chunks or 4 * workers
+        size = max(1, (len(tokens) - 1) // chunks)
+        result, start = [], 0
+        for i, token in enumerate(tokens[:-1]):
+            if token.name in self.syncset and i + 1 - start >= size:
+                result.append(tokens[start:i + 1])
+                start = i + 1
+        if start < len(tokens) - 1:
+            result.append(tokens[start:-1])
+        return result
+
+    def parse(self, tokens):
+        list_state = self.table.gotodict[0].get(self.listname)
+        if list_state is None:
+            # the list nonterm must begin the input,
+            # so that state 0 has a goto on it
+            text = 'Illegal list: %s'
+            raise GramError(text % self.listname)
+        tokens = list(tokens)
+        chunks = self.split(tokens)
+        if len(chunks) < 2:
+            return LRParser(self.table).parse(tokens)
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                self.workers, initializer=init_worker,
+                initargs=(self.table,))
+        futures = []
+        for i, chunk in enumerate(chunks):
+            if i + 1 < len(chunks):
+                lookahead = chunks[i + 1][0]
+            else:
+                lookahead = tokens[-1]
+            args = chunk, lookahead, self.listname, self.seed, i == 0
+            futures.append(self.executor.submit(parse_chunk, *args))
+        try:
+            values = [f.result() for f in futures]
+        except GramError:
+            # the sync terms are not at the top level,
+            # so parse it as usual for the same result
+            return LRParser(self.table).parse(tokens)
+        value = values[0]
+        for each in values[1:]:
+            value = self.merge(value, each)
+        # finish the parse with the merged list
+        parser = LRParser(self.table)
+        parser.restart()
+        parser.statestack.append(list_state)
+        parser.symbolstack.append(LRToken(self.listname, value))
+        value = parser.push(tokens[-1])
+        if not parser.accepted:
+            message = 'Parsing error.'
+            raise GramError(message)
+        return value
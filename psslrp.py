@@ -0,0 +1,193 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+import mmap
+import struct
+from array import array
+from multiprocessing.shared_memory import SharedMemory
+
+from pslrp import GramError, Grammar, LRTable
+
+# the cells without any action or goto, as
+# 0 is accept, and reduce is neg in cells
+ERROR = -2 ** 31
+# the fingerprints of the table and the grammar,
+# and the numbers of states, terms and nonterms
+HEADER = struct.Struct('40s40s3i')
+
+
+def flat_bytes(table: LRTable):
+    # the tables in one flat buffer, the header,
+    # then the default reduces of the states, the
+    # actions by the terms and $end, and the gotos
+    # by the nonterms, all native int32 cells
+    if table.conflicts:
+        message = 'Conflicts in table, use GLRParser.'
+        raise GramError(message)
+    grammar = table.grammar
+    terms = list(grammar.termdict) + ['$end']
+    nonts = list(grammar.nontdict)
+    termid = {t: i for i, t in enumerate(terms)}
+    nontid = {n: i for i, n in enumerate(nonts)}
+    states = len(table.actiondict)
+    reduces = array('i', [0]) * states
+    for i, next in table.reducedict.items():
+        reduces[i] = next
+    actions = array('i', [ERROR]) * (states * len(terms))
+    for i, row in table.actiondict.items():
+        base = i * len(terms)
+        for name, next in row.items():
+            actions[base + termid[name]] = next
+    gotos = array('i', [ERROR]) * (states * len(nonts))
+    for i, row in table.gotodict.items():
+        base = i * len(nonts)
+        for name, next in row.items():
+            gotos[base + nontid[name]] = next
+    header = HEADER.pack(table.fingerprint.encode(),
+                         grammar.fingerprint.encode(),
+                         states, len(terms), len(nonts))
+    return b''.join([header, reduces.tobytes(),
+                     actions.tobytes(), gotos.tobytes()])
+
+
+class FlatRow:
+    # a row of the flat table, which looks up the
+    # cells as the dicts of LRTable do, and is a
+    # list of the cells by columns for the rows
+    # of parse_columns(), None if it is empty
+    __slots__ = ('cells', 'base', 'names', 'ids')
+
+    def __init__(self, cells, base, names, ids):
+        self.cells = cells
+        self.base = base
+        self.names = names
+        self.ids = ids
+
+    def __getitem__(self, column):
+        if column >= len(self.names): return None
+        next = self.cells[self.base + column]
+        return None if next == ERROR else next
+
+    def get(self, name, default=None):
+        column = self.ids.get(name)
+        if column is None: return default
+        next = self.cells[self.base + column]
+        return default if next == ERROR else next
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __iter__(self):
+        return (n for n, _ in self.items())
+
+    def __len__(self):
+        return sum(1 for _ in self.items())
+
+    def items(self):
+        cells, base = self.cells, self.base
+        for i, name in enumerate(self.names):
+            if cells[base + i] != ERROR:
+                yield name, cells[base + i]
+
+    def values(self):
+        return (next for _, next in self.items())
+
+
+class GotoRow(FlatRow):
+    # the gotos are looked up by the names
+    __slots__ = ()
+
+    def __getitem__(self, name):
+        next = self.get(name)
+        if next is None: raise KeyError(name)
+        return next
+
+
+class FlatTable:
+    # an LRTable read from a flat buffer, e.g. a
+    # shared memory or a mapped file, which all
+    # the workers share, only the rows and the
+    # default reduces are made in each process
+    def __init__(self, grammar, buffer, owner=None):
+        if isinstance(grammar, Grammar):
+            grammar = grammar.compile()
+        fingerprint, gram_print, states, width, height = \
+            HEADER.unpack_from(buffer)
+        if gram_print.decode() != grammar.fingerprint:
+            message = 'Flat table of another grammar.'
+            raise GramError(message)
+        self.grammar = grammar
+        self.fingerprint = fingerprint.decode()
+        self.keep_conflicts = False
+        self.conflicts = 0
+        # the shared memory or the mmap to close
+        self.owner = owner
+        size = states * (1 + width + height) * 4
+        self.view = memoryview(buffer)[HEADER.size:HEADER.size + size]
+        self.cells = self.view.cast('i')
+        terms = list(grammar.termdict) + ['$end']
+        nonts = list(grammar.nontdict)
+        if (len(terms), len(nonts)) != (width, height):
+            message = 'Flat table of another grammar.'
+            raise GramError(message)
+        self.termid = {t: i for i, t in enumerate(terms)}
+        nontid = {n: i for i, n in enumerate(nonts)}
+        cells = self.cells
+        self.reducedict = {i: cells[i] for i in range(states) if cells[i]}
+        actions, gotos = states, states * (1 + width)
+        self.actiondict = {i: FlatRow(cells, actions + i * width,
+                                      terms, self.termid)
+                           for i in range(states)}
+        self.gotodict = {i: GotoRow(cells, gotos + i * height,
+                                    nonts, nontid)
+                         for i in range(states)}
+        self.actionrows = list(self.actiondict.values())
+        entries = enumerate(grammar.entrydict)
+        self.startdict = {name: i for i, name in entries}
+
+    @property
+    def prodlist(self):
+        return self.grammar.prodlist
+
+    def build_rows(self):
+        return self.actionrows
+
+    @classmethod
+    def share(cls, table: LRTable, name=None):
+        # the owner should unlink() it at last
+        data = flat_bytes(table)
+        shm = SharedMemory(name, create=True, size=len(data))
+        shm.buf[:len(data)] = data
+        return cls(table.grammar, shm.buf, shm)
+
+    @classmethod
+    def attach(cls, grammar, name):
+        shm = SharedMemory(name)
+        return cls(grammar, shm.buf, shm)
+
+    @staticmethod
+    def save(table: LRTable, path):
+        with open(path, 'wb') as f:
+            f.write(flat_bytes(table))
+
+    @classmethod
+    def load(cls, grammar, path):
+        # the pages of the file are shared by all
+        # the processes mapping it read only
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(grammar, mm, mm)
+
+    @property
+    def name(self):
+        return getattr(self.owner, 'name', None)
+
+    def close(self):
+        # the rows can not be used after it
+        self.cells.release()
+        self.view.release()
+        if self.owner is not None:
+            self.owner.close()
+
+    def unlink(self):
+        if isinstance(self.owner, SharedMemory):
+            self.owner.unlink()
@@ -0,0 +1,48 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+from psglrp import GLRParser, count_trees
+from pslrp import Grammar, LRToken, SLRTable
+
+termlist = ['+', '*', 'd']
+
+
+def meet_e_epe(sym, args, stack):
+    # production: E -> E + E
+    sym.value = args[0].value + args[2].value
+
+
+def meet_e_eme(sym, args, stack):
+    # production: E -> E * E
+    sym.value = args[0].value * args[2].value
+
+
+def meet_e_d(sym, args, stack):
+    # production: E -> d
+    sym.value = args[0].value
+
+
+def choose_first(node):
+    # always choose the first alternative
+    # of the ambiguous node in the forest
+    return 0
+
+
+if __name__ == '__main__':
+    g = Grammar(termlist)
+    g.add_prod('E', ['E', '+', 'E'], meet_e_epe)
+    g.add_prod('E', ['E', '*', 'E'], meet_e_eme)
+    g.add_prod('E', ['d'], meet_e_d)
+    g.set_start()
+    print(str(g))
+    # keep the conflicts in the table
+    t = SLRTable(g, keep_conflicts=True)
+    p = GLRParser(t)
+    s = [LRToken('d', 3),
+         LRToken('*'),
+         LRToken('d', 5),
+         LRToken('+'),
+         LRToken('d', 4),
+         LRToken('$end')]
+    forest = p.parse(s)
+    print(count_trees(forest))
+    print(p.evaluate(forest, choose_first))
@@ -0,0 +1,127 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+from pslrp import CLRTable, Grammar, LRParser, LRToken
+
+termlist = ['+', '-', '*', '^', '&', '(', ')', 'd']
+
+
+def meet_s_e(sym, args, stack):
+    # production: S -> E
+    sym.value = args[0].value
+
+
+def meet_e_f(sym, args, stack):
+    # production: E -> F
+    sym.value = args[0].value
+
+
+def meet_e_epf(sym, args, stack):
+    # production: E -> E + F
+    sym.value = args[0].value + args[2].value
+
+
+def meet_e_emf(sym, args, stack):
+    # production: E -> E - F
+    sym.value = args[0].value - args[2].value
+
+
+def meet_e_etf(sym, args, stack):
+    # production: E -> E * F
+    sym.value = args[0].value * args[2].value
+
+
+def meet_e_ecf(sym, args, stack):
+    # production: E -> E ^ F
+    sym.value = args[0].value ** args[2].value
+
+
+def meet_c_cae(sym, args, stack):
+    # production: C -> C & E
+    sym.value = (args[0].value, '&', args[2].value)
+
+
+def meet_f_beb(sym, args, stack):
+    # production: F -> ( E )
+    sym.value = args[1].value
+
+
+def meet_f_d(sym, args, stack):
+    # production: F -> d
+    sym.value = args[0].value
+
+
+def show(node):
+    # the tree of parse_tree() in parentheses
+    if node.is_token:
+        if node.value is None: return node.name
+        return str(node.value)
+    kids = [show(k) for k in node.children]
+    if len(kids) == 1: return kids[0]
+    return '(%s)' % ' '.join(kids)
+
+
+if __name__ == '__main__':
+    g = Grammar(termlist)
+    g.add_prod('S', ['E'], meet_s_e)
+    # from the lowest precedence to the highest
+    g.add_expr('E', 'F', [('left', {'+': meet_e_epf, '-': meet_e_emf}),
+                          ('left', {'*': meet_e_etf}),
+                          ('right', {'^': meet_e_ecf})], meet_e_f)
+    g.add_prod('F', ['(', 'E', ')'], meet_f_beb)
+    g.add_prod('F', ['d'], meet_f_d)
+    g.set_start()
+    print(str(g))
+    t = CLRTable(g)
+    # t = SLRTable(g)
+    p = LRParser(t)
+    # 2 + 3 * 2 ^ 3 ^ 2 - (1 - 4) * 2
+    s = [LRToken('d', 2),
+         LRToken('+'),
+         LRToken('d', 3),
+         LRToken('*'),
+         LRToken('d', 2),
+         LRToken('^'),
+         LRToken('d', 3),
+         LRToken('^'),
+         LRToken('d', 2),
+         LRToken('-'),
+         LRToken('('),
+         LRToken('d', 1),
+         LRToken('-'),
+         LRToken('d', 4),
+         LRToken(')'),
+         LRToken('*'),
+         LRToken('d', 2),
+         LRToken('$end')]
+    print(p.parse(s))
+    print(show(p.parse_tree(s).root))
+    # the chain of C over the chain of E
+    g = Grammar(termlist)
+    g.add_prod('S', ['C'], meet_s_e)
+    g.add_expr('C', 'E', [('left', {'&': meet_c_cae})], meet_e_f)
+    g.add_expr('E', 'F', [('left', {'+': meet_e_epf}),
+                          ('left', {'*': meet_e_etf})], meet_e_f)
+    g.add_prod('F', ['(', 'C', ')'], meet_f_beb)
+    g.add_prod('F', ['d'], meet_f_d)
+    g.set_start()
+    p = LRParser(CLRTable(g))
+    # 1 & 2 + 3 * 4
+    s = [LRToken('d', 1),
+         LRToken('&'),
+         LRToken('d', 2),
+         LRToken('+'),
+         LRToken('d', 3),
+         LRToken('*'),
+         LRToken('d', 4),
+         LRToken('$end')]
+    print(p.parse(s))
+    print(show(p.parse_tree(s).root))
+    # snapshot in the middle of the chain, which
+    # keeps the prod indexes instead of the funcs
+    p = LRParser(CLRTable(g))
+    for token in s[:6]: p.push(token)
+    blob = p.snapshot()
+    p = LRParser(p.table)
+    p.resume(blob)
+    for token in s[6:]: value = p.push(token)
+    print(value)
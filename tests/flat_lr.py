@@ -0,0 +1,90 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from pslrp import CLRTable, Grammar, LRParser, LRToken
+from psslrp import FlatTable
+
+termlist = ['x', 'y', ';', '{', '}']
+
+
+def meet_p_ps(sym, args, stack):
+    # production: P -> P S
+    sym.value = args[0].value + [args[1].value]
+
+
+def meet_p(sym, args, stack):
+    # production: P -> <empty>
+    sym.value = []
+
+
+def meet_s_xb(sym, args, stack):
+    # production: S -> x ;
+    sym.value = 'x'
+
+
+def meet_s_xyb(sym, args, stack):
+    # production: S -> x y ;
+    sym.value = 'xy'
+
+
+def meet_s_lpr(sym, args, stack):
+    # production: S -> { P }
+    sym.value = args[1].value
+
+
+def make_grammar():
+    g = Grammar(termlist)
+    g.add_prod('P', ['P', 'S'], meet_p_ps)
+    g.add_prod('P', [], meet_p)
+    g.add_prod('S', ['x', ';'], meet_s_xb)
+    g.add_prod('S', ['x', 'y', ';'], meet_s_xyb)
+    g.add_prod('S', ['{', 'P', '}'], meet_s_lpr)
+    g.set_start()
+    return g
+
+
+def same(a, b):
+    # the same cells, read through the rows
+    for i in range(len(a.actiondict)):
+        if dict(a.actiondict[i].items()) != dict(b.actiondict[i].items()):
+            return False
+        if dict(a.gotodict[i].items()) != dict(b.gotodict[i].items()):
+            return False
+    return a.reducedict == b.reducedict
+
+
+def parse_shared(name, tokens):
+    # run in a worker, which maps the same
+    # memory instead of copying the table
+    table = FlatTable.attach(make_grammar(), name)
+    try:
+        return LRParser(table).parse(tokens)
+    finally:
+        table.close()
+
+
+if __name__ == '__main__':
+    g = make_grammar()
+    print(str(g))
+    t = CLRTable(g)
+    s = ['x', ';', '{', 'x', 'y', ';', '}', '$end']
+    s = [LRToken(each) for each in s]
+    print(LRParser(t).parse(s))
+    # in the shared memory, which the creator
+    # closes and unlinks at last
+    shared = FlatTable.share(t)
+    print(same(t, shared), LRParser(shared).parse(s))
+    with ProcessPoolExecutor(2) as pool:
+        print(pool.submit(parse_shared, shared.name, s).result())
+    shared.close()
+    shared.unlink()
+    # in a file, mapped read only
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'table.bin')
+        FlatTable.save(t, path)
+        loaded = FlatTable.load(g, path)
+        print(same(t, loaded), LRParser(loaded).parse(s))
+        loaded.close()
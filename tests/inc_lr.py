@@ -0,0 +1,61 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+from psilrp import IncLRParser
+from pslrp import CLRTable, Grammar, LRToken
+
+termlist = ['x', 'y', ';', '{', '}']
+
+
+def show(node):
+    # the tree in parentheses, without P -> <empty>
+    if node.is_token: return node.token.name
+    kids = [show(k) for k in node.kids]
+    kids = [k for k in kids if k]
+    if not kids: return ''
+    if len(kids) == 1: return kids[0]
+    return '(%s)' % ' '.join(kids)
+
+
+def nodes(node):
+    # all the nodes of the tree
+    todo = [node]
+    while todo:
+        node = todo.pop()
+        yield node
+        todo.extend(node.kids)
+
+
+def tokens(text):
+    return [LRToken(each) for each in text.split()]
+
+
+if __name__ == '__main__':
+    g = Grammar(termlist)
+    g.add_prod('P', ['P', 'S'])
+    g.add_prod('P', [])
+    g.add_prod('S', ['x', ';'])
+    g.add_prod('S', ['x', 'y', ';'])
+    g.add_prod('S', ['{', 'P', '}'])
+    g.set_start()
+    print(str(g))
+    t = CLRTable(g)
+    p = IncLRParser(t)
+    root = p.parse(tokens('x ; { x y ; x ; } x y ; x ; $end'))
+    print(show(root))
+    # (start, end, tokens) of the edits
+    edits = [(0, 0, 'x y ;'),           # insert at the start
+             (0, 3, ''),                # delete at the start
+             (6, 8, ''),                # delete in the middle
+             (3, 3, '{ x ; }'),         # insert in the middle
+             (14, 16, 'x y ;'),         # replace at the end
+             (17, 17, '{ }'),           # insert at the end
+             (14, 19, '')]              # delete at the end
+    for start, end, text in edits:
+        old = set(map(id, nodes(p.root)))
+        root = p.edit(start, end, tokens(text))
+        new = list(nodes(root))
+        reused = sum(1 for n in new if id(n) in old)
+        # the same tree as parsing all the tokens
+        fresh = IncLRParser(t).parse(p.tokens)
+        print(show(root), show(root) == show(fresh),
+              '%d/%d reused' % (reused, len(new)))
@@ -0,0 +1,62 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+from psplrp import ParallelLRParser
+from pslrp import CLRTable, GramError, Grammar, LRParser, LRToken
+
+termlist = ['x', 'y', ';']
+
+
+def meet_s_p(sym, args, stack):
+    # production: S -> P
+    sym.value = args[0].value
+
+
+def meet_p_pt(sym, args, stack):
+    # production: P -> P T
+    sym.value = args[0].value + [args[1].value]
+
+
+def meet_p(sym, args, stack):
+    # production: P -> <empty>
+    sym.value = []
+
+
+def meet_t_xb(sym, args, stack):
+    # production: T -> x ;
+    sym.value = 'x'
+
+
+def meet_t_xyb(sym, args, stack):
+    # production: T -> x y ;
+    sym.value = 'xy'
+
+
+def merge(left, right):
+    # the values of P in two chunks
+    return left + right
+
+
+if __name__ == '__main__':
+    g = Grammar(termlist)
+    g.add_prod('S', ['P'], meet_s_p)
+    g.add_prod('P', ['P', 'T'], meet_p_pt)
+    g.add_prod('P', [], meet_p)
+    g.add_prod('T', ['x', ';'], meet_t_xb)
+    g.add_prod('T', ['x', 'y', ';'], meet_t_xyb)
+    # the items of the list end with ;
+    g.set_sync([';'])
+    g.set_start()
+    print(str(g))
+    t = CLRTable(g)
+    s = ['x', ';', 'x', 'y', ';'] * 50 + ['$end']
+    s = [LRToken(each) for each in s]
+    # the seed is the value of P -> <empty>,
+    # and the pool is shut down at the end
+    with ParallelLRParser(t, 'P', merge, [], workers=2, chunks=8) as p:
+        value = p.parse(s)
+    print(len(value), value[:4])
+    print(value == LRParser(t).parse(s))
+    try:
+        ParallelLRParser(t, 'T', merge).parse(s)
+    except GramError as e:
+        print(e)
@@ -0,0 +1,35 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+from pslrp import CLRTable, Grammar
+
+termlist = ['x', 'y', ',', ';', '(', ')']
+
+
+def same(a, b):
+    # the same states, actions and gotos
+    return (a.actiondict == b.actiondict and
+            a.gotodict == b.gotodict and
+            a.reducedict == b.reducedict)
+
+
+if __name__ == '__main__':
+    g = Grammar(termlist)
+    g.add_prod('P', ['P', 'S'])
+    g.add_prod('P', ['S'])
+    g.add_prod('S', ['x', 'A', ';'])
+    g.add_prod('A', ['A', ',', 'y'])
+    g.add_prod('A', ['y'])
+    g.set_start()
+    print(str(g))
+    # the workers build the closures of each
+    # round, and the states are numbered the
+    # same as the sequential build
+    pooled = CLRTable(g, workers=2)
+    sequential = CLRTable(g)
+    print(len(pooled.actiondict), same(pooled, sequential))
+    # only the closures using A are built again
+    g.add_prod('A', ['(', 'A', ')'])
+    pooled.update()
+    sequential.update()
+    print(len(pooled.actiondict), same(pooled, sequential),
+          same(pooled, CLRTable(g)))
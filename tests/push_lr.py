@@ -0,0 +1,50 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+from pslrp import CLRTable, Grammar, LRParser, LRToken
+
+termlist = ['x', 'y', ';']
+
+
+def meet_p_ps(sym, args, stack):
+    # production: P -> P S
+    sym.value = args[0].value + [args[1].value]
+
+
+def meet_p(sym, args, stack):
+    # production: P -> <empty>
+    sym.value = []
+
+
+def meet_s_xb(sym, args, stack):
+    # production: S -> x ;
+    sym.value = 'x'
+    print('reduce S -> x ;')
+
+
+def meet_s_xyb(sym, args, stack):
+    # production: S -> x y ;
+    sym.value = 'xy'
+    print('reduce S -> x y ;')
+
+
+if __name__ == '__main__':
+    g = Grammar(termlist)
+    g.add_prod('P', ['P', 'S'], meet_p_ps)
+    g.add_prod('P', [], meet_p)
+    g.add_prod('S', ['x', ';'], meet_s_xb)
+    g.add_prod('S', ['x', 'y', ';'], meet_s_xyb)
+    g.set_start()
+    print(str(g))
+    t = CLRTable(g)
+    p = LRParser(t)
+    # the statements are reduced right after
+    # their ;, without waiting for the next
+    s = ['x', ';', 'x', 'y', ';', '$end']
+    for each in s:
+        print('push', each)
+        value = p.push(LRToken(each))
+    print(value, p.accepted)
+    # the next token starts a new parse
+    for each in ['x', ';', '$end']:
+        value = p.push(LRToken(each))
+    print(value)
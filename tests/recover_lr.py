@@ -0,0 +1,67 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+from pslrp import CLRTable, Grammar, LRParser, LRToken, SLRTable
+
+termlist = ['x', 'y', ';', '{', '}', 'error']
+
+
+def meet_p_ps(sym, args, stack):
+    # production: P -> P S
+    sym.value = args[0].value + [args[1].value]
+
+
+def meet_p(sym, args, stack):
+    # production: P -> <empty>
+    sym.value = []
+
+
+def meet_s_xb(sym, args, stack):
+    # production: S -> x ;
+    sym.value = args[0].name
+
+
+def meet_s_xyb(sym, args, stack):
+    # production: S -> x y ;
+    sym.value = args[0].name + args[1].name
+
+
+def meet_s_lpr(sym, args, stack):
+    # production: S -> { P }
+    sym.value = args[1].value
+
+
+def meet_s_eb(sym, args, stack):
+    # production: S -> error ;
+    # value of error is the bad token
+    sym.value = 'error(%s)' % args[0].value
+
+
+if __name__ == '__main__':
+    g = Grammar(termlist)
+    g.add_prod('P', ['P', 'S'], meet_p_ps)
+    g.add_prod('P', [], meet_p)
+    g.add_prod('S', ['x', ';'], meet_s_xb)
+    g.add_prod('S', ['x', 'y', ';'], meet_s_xyb)
+    g.add_prod('S', ['{', 'P', '}'], meet_s_lpr)
+    g.add_prod('S', ['error', ';'], meet_s_eb)
+    g.set_start()
+    print(str(g))
+    t = CLRTable(g)
+    # t = SLRTable(g)
+    p = LRParser(t)
+    p.set_recovery()
+    s = ['x', ';', 'y', 'y', ';', 'x', 'y', ';',
+         'x', 'x', ';', 'x', ';', '$end']
+    s = [LRToken(each) for each in s]
+    print(p.parse(s))
+    for e in p.errors:
+        print(e, e.expected)
+    # the SLR table reduces P on $end after {,
+    # which is not followed by $end at last
+    p = LRParser(SLRTable(g))
+    p.set_recovery()
+    s = ['x', ';', '{', 'x', ';', '{', 'y', '$end']
+    s = [LRToken(each) for each in s]
+    print(p.parse(s))
+    for e in p.errors:
+        print(e, e.expected)
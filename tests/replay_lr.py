@@ -0,0 +1,69 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+from pslrp import CLRTable, Grammar, LRParser, LRToken
+
+termlist = ['+', '*', '(', ')', 'd']
+
+
+def meet_e_ept(sym, args, stack):
+    # production: E -> E + T
+    sym.value = args[0].value + args[2].value
+
+
+def meet_t_tmf(sym, args, stack):
+    # production: T -> T * F
+    sym.value = args[0].value * args[2].value
+
+
+def meet_f_beb(sym, args, stack):
+    # production: F -> ( E )
+    sym.value = args[1].value
+
+
+def meet_copy(sym, args, stack):
+    # production: E -> T, T -> F and F -> d
+    sym.value = args[0].value
+
+
+def show(sym, args, stack):
+    # any production, in parentheses
+    kids = [a.name if a.value is None else str(a.value) for a in args]
+    sym.value = kids[0] if len(kids) == 1 else '(%s)' % ' '.join(kids)
+
+
+def count(sym, args, stack):
+    # any production, the number of tokens
+    sym.value = sum(1 if a.name in termlist else a.value for a in args)
+
+
+if __name__ == '__main__':
+    g = Grammar(termlist)
+    g.add_prod('E', ['E', '+', 'T'], meet_e_ept)
+    g.add_prod('E', ['T'], meet_copy)
+    g.add_prod('T', ['T', '*', 'F'], meet_t_tmf)
+    g.add_prod('T', ['F'], meet_copy)
+    g.add_prod('F', ['(', 'E', ')'], meet_f_beb)
+    g.add_prod('F', ['d'], meet_copy)
+    g.set_start()
+    print(str(g))
+    t = CLRTable(g)
+    # record the shifted tokens and the prods
+    p = LRParser(t, logging=True)
+    # 2 * (3 + 4) + 5
+    s = [LRToken('d', 2),
+         LRToken('*'),
+         LRToken('('),
+         LRToken('d', 3),
+         LRToken('+'),
+         LRToken('d', 4),
+         LRToken(')'),
+         LRToken('+'),
+         LRToken('d', 5),
+         LRToken('$end')]
+    print(p.parse(s))
+    print(list(p.reducelog))
+    # other actions by the prod index, without
+    # parsing the tokens again
+    shows = {each.index: show for each in g.prodlist}
+    counts = {each.index: count for each in g.prodlist}
+    print(p.replay(s, [shows, counts]))
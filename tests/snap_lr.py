@@ -0,0 +1,56 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+from pslrp import CLRTable, GramError, Grammar, LRParser, LRToken, SLRTable
+
+termlist = ['x', 'y', ';']
+
+
+def meet_p_ps(sym, args, stack):
+    # production: P -> P S
+    sym.value = args[0].value + [args[1].value]
+
+
+def meet_p(sym, args, stack):
+    # production: P -> <empty>
+    sym.value = []
+
+
+def meet_s_xb(sym, args, stack):
+    # production: S -> x ;
+    sym.value = 'x'
+
+
+def meet_s_xyb(sym, args, stack):
+    # production: S -> x y ;
+    sym.value = 'xy'
+
+
+if __name__ == '__main__':
+    g = Grammar(termlist)
+    g.add_prod('P', ['P', 'S'], meet_p_ps)
+    g.add_prod('P', [], meet_p)
+    g.add_prod('S', ['x', ';'], meet_s_xb)
+    g.add_prod('S', ['x', 'y', ';'], meet_s_xyb)
+    g.set_start()
+    print(str(g))
+    t = CLRTable(g)
+    s = ['x', ';', 'x', 'y', ';', 'x', ';', '$end']
+    s = [LRToken(each) for each in s]
+    p = LRParser(t)
+    for token in s[:4]: p.push(token)
+    # the stacks and the position in bytes,
+    # e.g. to be saved and resumed later
+    blob = p.snapshot()
+    print(type(blob).__name__, p.position)
+    q = LRParser(t)
+    q.resume(blob)
+    for token in s[q.position:]: value = q.push(token)
+    print(value)
+    # the original parser goes on as well
+    for token in s[p.position:]: value = p.push(token)
+    print(value)
+    # only the table of the snapshot resumes it
+    try:
+        LRParser(SLRTable(g)).resume(blob)
+    except GramError as e:
+        print(e)
@@ -0,0 +1,58 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+from pslrp import CLRTable, Grammar, LRParser, LRToken
+
+termlist = ['x', 'y', ';']
+
+
+def meet_p_ps(sym, args, stack):
+    # production: P -> P S
+    # the streamed S is left without value
+    sym.value = args[0].value + 1
+
+
+def meet_p(sym, args, stack):
+    # production: P -> <empty>
+    sym.value = 0
+
+
+def meet_s_xb(sym, args, stack):
+    # production: S -> x ;
+    sym.value = 'x'
+
+
+def meet_s_xyb(sym, args, stack):
+    # production: S -> x y ;
+    sym.value = 'xy'
+
+
+def tokens():
+    # a generator, the tokens are never listed
+    for each in ['x', ';', 'x', 'y', ';', 'x', ';', '$end']:
+        yield LRToken(each)
+
+
+if __name__ == '__main__':
+    g = Grammar(termlist)
+    g.add_prod('P', ['P', 'S'], meet_p_ps)
+    g.add_prod('P', [], meet_p)
+    g.add_prod('S', ['x', ';'], meet_s_xb)
+    g.add_prod('S', ['x', 'y', ';'], meet_s_xyb)
+    g.set_start()
+    print(str(g))
+    t = CLRTable(g)
+    p = LRParser(t)
+    # hand every S to the callback once reduced
+    p.stream('S', lambda sym: print('callback', sym.value))
+    print(p.parse(list(tokens())))
+    p.stream('S')
+    # or yield them from a generator, and the
+    # value of P is returned by StopIteration
+    stream = p.parse_stream(tokens(), ['S'])
+    while True:
+        try:
+            sym = next(stream)
+        except StopIteration as stop:
+            print(stop.value)
+            break
+        print('yield', sym.value)
@@ -0,0 +1,39 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+from pslrp import CLRTable, Grammar, LRParser, LRToken
+
+termlist = ['x', 'y', ';', '{', '}']
+
+
+def depth(node):
+    # the number of ancestors of the node
+    n = 0
+    while node.parent is not None:
+        node = node.parent
+        n += 1
+    return n
+
+
+if __name__ == '__main__':
+    g = Grammar(termlist)
+    # no semantic action is needed for the tree
+    g.add_prod('P', ['P', 'S'])
+    g.add_prod('P', [])
+    g.add_prod('S', ['x', ';'])
+    g.add_prod('S', ['x', 'y', ';'])
+    g.add_prod('S', ['{', 'P', '}'])
+    g.set_start()
+    print(str(g))
+    t = CLRTable(g)
+    p = LRParser(t)
+    s = ['x', ';', '{', 'x', 'y', ';', '}', '$end']
+    s = [LRToken(each) for each in s]
+    tree = p.parse_tree(s)
+    # the columns of the nodes, 0 is a token
+    print(len(tree), list(tree.kind))
+    for i in tree.preorder():
+        node = tree[i]
+        print('  ' * depth(node) + str(node), node.span)
+    # the statements in the block
+    block = tree.root.children[1]
+    print([str(n) for n in block.children])
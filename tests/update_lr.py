@@ -0,0 +1,68 @@
+#!/usr/bin/env/python3
+# -*- coding: utf-8 -*-
+from pslrp import CLRTable, GramError, Grammar, LRParser, LRToken, SLRTable
+
+termlist = ['x', 'y', ';', '{', '}']
+
+
+def meet_p_ps(sym, args, stack):
+    # production: P -> P S
+    sym.value = args[0].value + [args[1].value]
+
+
+def meet_p(sym, args, stack):
+    # production: P -> <empty>
+    sym.value = []
+
+
+def meet_s_xb(sym, args, stack):
+    # production: S -> x ;
+    sym.value = 'x'
+
+
+def meet_s_xyb(sym, args, stack):
+    # production: S -> x y ;
+    sym.value = 'xy'
+
+
+def meet_s_lpr(sym, args, stack):
+    # production: S -> { P }
+    sym.value = args[1].value
+
+
+def same(a, b):
+    # the same states, actions and gotos
+    return (a.actiondict == b.actiondict and
+            a.gotodict == b.gotodict and
+            a.reducedict == b.reducedict)
+
+
+if __name__ == '__main__':
+    g = Grammar(termlist)
+    g.add_prod('P', ['P', 'S'], meet_p_ps)
+    g.add_prod('P', [], meet_p)
+    g.add_prod('S', ['x', ';'], meet_s_xb)
+    g.set_start()
+    tables = [SLRTable(g), CLRTable(g)]
+    s = ['x', ';', 'x', 'y', ';', '{', 'x', ';', '}', '$end']
+    s = [LRToken(each) for each in s]
+    try:
+        LRParser(tables[0]).parse(s)
+    except GramError as e:
+        print(e)
+    # add prods after set_start(), then update
+    # the tables instead of building them again
+    g.add_prod('S', ['x', 'y', ';'], meet_s_xyb)
+    g.add_prod('S', ['{', 'P', '}'], meet_s_lpr)
+    print(str(g))
+    for t in tables:
+        t.update()
+        fresh = type(t)(g)
+        print(type(t).__name__, len(t.actiondict), same(t, fresh))
+        print(LRParser(t).parse(s))
+    # a compiled table can not be updated
+    tables[1].compile()
+    try:
+        tables[1].update()
+    except GramError as e:
+        print(e)